@@ -1,55 +1,70 @@
+import numpy as np
+
+from voting.ranked_results import RankedResults
+
+
 def get_winner(results):
     """
-    Returns the winning candidate. In the case of a tie, the winner will be chosen alphabetically (i.e., the agent
-    whose name begins with the lowest letter in the alphabet)
+    Returns the winning candidate. In the case of a tie, the winner will be the candidate with the lowest id, which is
+    the first of the tied candidates in the results (alphabetically, for an alphabetical string of candidates)
 
-    :param: results: A dictionary of results
-    :return: A string with one character indicating the winner
+    :param: results: A dictionary of results, with the candidates in the order of their ids. The winner of
+    RankedResults is looked up in O(1)
+    :return: The winning candidate
     """
+    if isinstance(results, RankedResults):
+        return results.get_winner()
 
-    winner = ""
-    max_votes = 0
+    winner = None
 
     for candidate in results:
-        if results[candidate] > max_votes:
+        if winner is None or results[candidate] > results[winner]:
             winner = candidate
-            max_votes = results[candidate]
 
-        elif results[candidate] < max_votes:
-            continue
+    return winner
 
-        else:
-            # Lexicographically determine winner if votes are equal
-            if candidate < winner:
-                winner = candidate
-                max_votes = results[candidate]
 
-    return winner
+def get_ballot_dtype(n_candidates):
+    """
+    Returns the smallest unsigned integer type able to hold a candidate index
+
+    :param n_candidates: An integer for the number of candidates in the election
+    :return: A numpy dtype
+    """
+    if n_candidates <= np.iinfo(np.uint8).max + 1:
+        return np.uint8
+    if n_candidates <= np.iinfo(np.uint16).max + 1:
+        return np.uint16
+    return np.uint32
 
 
 class Agent:
     """
     Class for an agent
+
+    An agent is a thin view over one row of the election's ballot matrix. The row holds candidate ids in preference
+    order, and the tallied preference dictionary (keyed by the labels of the candidates) is only built when it is
+    asked for
     """
 
-    def __init__(self, name, preference_string, voting_scheme):
+    def __init__(self, name, ballot, labels, voting_scheme):
         """
         Constructor for an agent
 
         :param name: A string for the name of the agent
-        :param preference_string: A string indicating the preferences in order
+        :param ballot: A numpy array of candidate ids in preference order (usually a row of the ballot matrix)
+        :param labels: A sequence of candidate labels, mapping a candidate id to its label (a string of letters, or
+        a tuple of labels)
         :param voting_scheme: A voting scheme object (Borda, Plurality, etc.)
         """
 
         self.name = name
+        self.ballot = ballot
+        self.labels = labels
+        self.voting_scheme = voting_scheme
 
-        self.preferences = {}
-
-        for preference in preference_string:
-            self.preferences[preference] = 0
-
-        # Tally votes depending on voting scheme
-        voting_scheme().tally_personal_votes(self.preferences)
+        self._preferences = None
+        self._positions = None
 
     def __str__(self):
         """
@@ -59,6 +74,33 @@ class Agent:
         """
         return self.name
 
+    @property
+    def preferences(self):
+        """
+        The tallied preferences of the agent, in preference order
+
+        :return: A dictionary with the tallied preferences of the agent
+        """
+        if self._preferences is None:
+            scores = self.voting_scheme.get_score_vector(len(self.ballot))
+            self._preferences = {self.labels[candidate]: int(score)
+                                 for candidate, score in zip(self.ballot, scores)}
+
+        return self._preferences
+
+    @property
+    def positions(self):
+        """
+        The position of every candidate in the preference list of the agent
+
+        :return: A dictionary mapping a candidate to its index in the preference list
+        """
+        if self._positions is None:
+            self._positions = {self.labels[candidate]: position
+                               for position, candidate in enumerate(self.ballot)}
+
+        return self._positions
+
     def get_preferences(self):
         """
         Gets the tallied preferences of the agent
@@ -69,30 +111,24 @@ class Agent:
 
     def get_happiness(self, result_dict):
         """
-        Computes happiness of an agent
+        Computes happiness of an agent. H_p only depends on the winner and H_si only on the place of the agent's
+        first preference, which RankedResults give in O(1). Every tally returns RankedResults, and other results are
+        ranked first
 
         :param: result_dict: A dictionary of results
         :return: Returns a dictionary of happiness values, representing the agent's happiness in different ways
         """
-        happiness_dict = {}
+        results = RankedResults.of(result_dict)
+        m = len(results)
 
         """
         What is the index of the winner in my preference list
         """
-        pref_list = list(self.preferences.keys())
-        index = pref_list.index(get_winner(result_dict))
-
-        happiness_dict["H_p"] = ((len(pref_list) - index - 1)/(len(pref_list) - 1)) * 100
+        index = self.positions[results.get_winner()]
 
         """
         What is the index of my first preference in the results
         """
-        result_list = sorted(result_dict, key=lambda k: result_dict[k], reverse=True)
-
-        index = result_list.index(pref_list[0])
-
-        happiness_dict["H_si"] = ((len(result_list) - index - 1)/(len(result_list) - 1)) * 100
-
-        return happiness_dict
-
+        rank = results.get_rank(self.labels[self.ballot[0]])
 
+        return {"H_p": ((m - index - 1)/(m - 1)) * 100, "H_si": ((m - rank - 1)/(m - 1)) * 100}
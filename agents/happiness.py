@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def get_position_matrix(profile):
+    """
+    Inverts a ballot matrix: entry (i, c) of the returned matrix is the position of candidate c in the preference
+    list of agent i. Since every row is a permutation, the inverse is a single argsort. A batch of ballot matrices
+    (elections x voters x positions) is inverted per election
+
+    :param profile: A numpy matrix (voters x positions) of candidate indices in preference order
+    :return: Returns a numpy matrix (voters x candidates) of positions
+    """
+    return np.argsort(profile, axis=-1, kind="stable")
+
+
+def get_outcome_ranks(totals):
+    """
+    Ranks the candidates by their tallied votes. Ties are broken in favour of the lowest candidate index, which is
+    the alphabetical tie-break of get_winner when the candidates are given in alphabetical order
+
+    :param totals: A numpy array of tallied votes, indexed by candidate (or a matrix, with one row per election)
+    :return: Returns a tuple (order, ranks), where order lists the candidates from first to last place and ranks
+    holds the place of each candidate
+    """
+    order = np.argsort(-np.asarray(totals), axis=-1, kind="stable")
+
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(order.shape[-1]), order.shape), axis=-1)
+
+    return order, ranks
+
+
+def get_profile_happiness(totals, profile, positions=None):
+    """
+    Computes the happiness of all agents at once. The outcome is ranked once, after which the position of the
+    winner in every preference list and the rank of every agent's first preference are array lookups
+
+    A batch of elections is evaluated in the same way, with totals of shape (elections x candidates) and a profile
+    of shape (elections x voters x positions)
+
+    :param totals: A numpy array of tallied votes, indexed by candidate
+    :param profile: A numpy matrix (voters x positions) of candidate indices in preference order
+    :param positions: The position matrix of the profile, computed from the profile when not given
+    :return: Returns a dictionary of numpy arrays, holding each agent's happiness for every type of happiness
+    """
+    if positions is None:
+        positions = get_position_matrix(profile)
+
+    m = profile.shape[-1]
+    order, ranks = get_outcome_ranks(totals)
+
+    # What is the index of the winner in my preference list
+    winners = np.broadcast_to(order[..., :1, None], positions.shape[:-1] + (1,))
+    winner_positions = np.take_along_axis(positions, winners, axis=-1)[..., 0]
+
+    # What is the index of my first preference in the results
+    first_preference_ranks = np.take_along_axis(ranks, profile[..., 0].astype(np.intp), axis=-1)
+
+    return {"H_p": ((m - winner_positions - 1) / (m - 1)) * 100,
+            "H_si": ((m - first_preference_ranks - 1) / (m - 1)) * 100}
@@ -0,0 +1,136 @@
+import numpy as np
+
+from voting.election_snapshot import ElectionSnapshot
+
+
+class ElectionAnalysis:
+    """
+    The tactical voting analysis of one election, shared by the report and the sweeps
+
+    Every artifact of the analysis is computed the first time it is asked for, and then kept. The tactical options of
+    an agent are thus computed once, whether they are needed for the basic TVA, the best responses, the concurrent
+    vote or the counter votes. The analysis works on an immutable snapshot of the election, so the election itself
+    is never changed
+
+    Agents with the same ranking see the same tally once their own ballot is taken out, so their tactical options
+    are the same. The analysis is therefore done once per distinct ranking, and shared by all agents casting it
+    """
+
+    def __init__(self, tva_object):
+        """
+        Constructor for the analysis of an election
+
+        :param tva_object: A TVA object, which has been run
+        """
+        self.election = tva_object
+        self.snapshot = ElectionSnapshot.of(tva_object)
+        self.scheme = tva_object.scheme()
+
+        self._tactical_sets = {}
+        self._ranking_tactical_sets = {}
+        self._ranking_counter_options = {}
+        self._tactical_summary = None
+        self._best_responses = None
+        self._concurrent_outcome = None
+        self._counter_votes = {}
+
+    def get_tactical_options(self, agent):
+        """
+        :param agent: An agent object of the election
+        :return: Returns the tactical options of the agent, as given by the tactical_options of the voting scheme.
+        The options are shared by all agents with the same ranking, and must not be changed
+        """
+        if agent.name not in self._tactical_sets:
+            ranking = self.snapshot.get_cast_ballot(agent)
+
+            if ranking not in self._ranking_tactical_sets:
+                self._ranking_tactical_sets[ranking] = self.scheme.tactical_options(agent, self.snapshot)
+
+            self._tactical_sets[agent.name] = self._ranking_tactical_sets[ranking]
+
+        return self._tactical_sets[agent.name]
+
+    def get_all_tactical_options(self):
+        """
+        :return: Returns a dictionary mapping the name of every agent to their tactical options
+        """
+        for agent in self.election.get_agents():
+            self.get_tactical_options(agent)
+
+        return self._tactical_sets
+
+    def get_tactical_summary(self):
+        """
+        Gets, for every agent, whether they have a tactical option and the best happiness they can reach with it.
+        When the voting scheme has a vectorized form, the election is summarised as a batch of one election, and
+        otherwise agent by agent with the summary mode of the voting scheme
+
+        :return: Returns a dictionary with, for every type of happiness, a tuple (has_option, best_happiness) of numpy
+        arrays indexed by agent
+        """
+        if self._tactical_summary is not None:
+            return self._tactical_summary
+
+        snapshot = self.snapshot
+        tactical_summary = self.scheme.get_batch_tactical_summary(snapshot.profile[None], snapshot.positions[None],
+                                                                  snapshot.totals[None])
+        if tactical_summary is not None:
+            tactical_summary = {key: (has_option[0], best_happiness[0])
+                                for key, (has_option, best_happiness) in tactical_summary.items()}
+
+        else:
+            agents = snapshot.get_agents()
+            counted_profile = snapshot.counted_profile
+            first_voters, groups = counted_profile.first_voters, counted_profile.groups
+
+            # Every distinct ranking is summarised by its first agent, and the summary is broadcast to the group
+            group_summary = {"H_p": (np.zeros(len(first_voters), dtype=bool), np.zeros(len(first_voters))),
+                             "H_si": (np.zeros(len(first_voters), dtype=bool), np.zeros(len(first_voters)))}
+
+            for i, first_voter in enumerate(first_voters):
+
+                agent_summary = self.scheme.get_tactical_summary(agents[first_voter], snapshot)
+
+                for key in agent_summary:
+                    has_option, best_happiness = group_summary[key]
+                    has_option[i], best_happiness[i] = agent_summary[key]
+
+            tactical_summary = {key: (has_option[groups], best_happiness[groups])
+                                for key, (has_option, best_happiness) in group_summary.items()}
+
+        self._tactical_summary = tactical_summary
+
+        return tactical_summary
+
+    def get_best_responses(self):
+        """
+        :return: Returns the best tactical option of every agent, as given by get_best_responses of the voting scheme
+        """
+        if self._best_responses is None:
+            self._best_responses = self.scheme.get_best_responses(self.snapshot, self.get_all_tactical_options())
+
+        return self._best_responses
+
+    def get_concurrent_outcome(self):
+        """
+        :return: Returns the outcome of every agent voting tactically at once, as given by concurrent_vote of the
+        voting scheme
+        """
+        if self._concurrent_outcome is None:
+            self._concurrent_outcome = self.scheme.concurrent_vote(self.snapshot, self.get_all_tactical_options())
+
+        return self._concurrent_outcome
+
+    def get_counter_vote(self, agent):
+        """
+        :param agent: An agent object of the election
+        :return: Returns the counter votes of the agent, as given by counter_vote of the voting scheme
+        """
+        if agent.name not in self._counter_votes:
+            # The counters of an outcome only depend on the ranking of the agent, so they are shared by its group
+            counter_options = self._ranking_counter_options.setdefault(self.snapshot.get_cast_ballot(agent), {})
+
+            self._counter_votes[agent.name] = self.scheme.counter_vote(agent, self.snapshot,
+                                                                       self.get_best_responses(), counter_options)
+
+        return self._counter_votes[agent.name]
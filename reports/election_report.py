@@ -0,0 +1,334 @@
+import json
+import numpy as np
+
+from agents.agent import get_winner
+from analysis.election_analysis import ElectionAnalysis
+
+# Verbosity levels of a report. Every record has a level, and only records up to the requested level are reported
+REPORT_SUMMARY = 0
+REPORT_AGENTS = 1
+REPORT_FULL = 2
+
+HAPPINESS_THRESHOLD = 99
+
+
+def get_option_records(tactical_dictionary, happiness_type, limit):
+    """
+    Converts the tactical options of one type of happiness into plain records
+
+    :param tactical_dictionary: A dictionary of tactical options, as returned by tactical_options for one type of
+    happiness
+    :param happiness_type: A string indicating the type of happiness
+    :param limit: The maximum number of options to convert, or None for all of them
+    :return: Returns a list of dictionaries
+    """
+    records = []
+
+    for option in tactical_dictionary:
+        if limit is not None and len(records) >= limit:
+            break
+
+        sublist = tactical_dictionary[option]
+        records.append({"option": option, "preferences": list(sublist[0]), "winner": sublist[1],
+                        "results": sublist[2], "happiness": sublist[3][happiness_type],
+                        "overall_happiness": sublist[4][happiness_type]})
+
+    return records
+
+
+def iter_levelled_records(tva_object, verbosity, limit, analysis=None):
+    """
+    Generates the records of the report of an election, each together with its verbosity level. Records are made
+    as the analysis goes, and no record is kept once it has been generated. Analysis which only feeds records above
+    the requested verbosity is skipped
+
+    :param tva_object: A TVA object, which has been run
+    :param verbosity: The verbosity level of the report
+    :param limit: The maximum number of agents (and of options per agent) to report, or None for all of them
+    :param analysis: The ElectionAnalysis of the election, to share its results with other consumers. Created here
+    when not given
+    :return: Yields tuples (level, record)
+    """
+    if analysis is None:
+        analysis = ElectionAnalysis(tva_object)
+
+    def within_limit(index):
+        return limit is None or index < limit
+
+    agents = tva_object.get_agents()
+
+    yield REPORT_SUMMARY, {"type": "title", "title": "ELECTION RESULTS"}
+    yield REPORT_SUMMARY, {"type": "voting_scheme", "voting_scheme": tva_object.voting_scheme}
+
+    yield REPORT_AGENTS, {"type": "preferences_header"}
+    for i, a in enumerate(agents):
+        if within_limit(i):
+            yield REPORT_AGENTS, {"type": "preferences", "agent": str(a),
+                                  "preferences": list(a.get_preferences().keys())}
+
+    yield REPORT_SUMMARY, {"type": "results", "results": tva_object.results,
+                           "winner": get_winner(tva_object.results)}
+
+    all_happiness = tva_object.get_all_happiness(tva_object.results)
+    agent_happiness = [{key: float(all_happiness[key][i]) for key in all_happiness} for i in range(len(agents))]
+
+    yield REPORT_AGENTS, {"type": "happiness_header"}
+    for i, a in enumerate(agents):
+        if within_limit(i):
+            yield REPORT_AGENTS, {"type": "happiness", "agent": str(a), "happiness": agent_happiness[i]}
+
+    yield REPORT_SUMMARY, {"type": "overall_happiness",
+                           "overall_happiness": {key: float(np.mean(all_happiness[key])) for key in all_happiness}}
+
+    yield REPORT_SUMMARY, {"type": "title", "title": "TACTICAL VOTING"}
+
+    at_risk_count = {"H_p": 0, "H_si": 0}
+
+    # Check how agents would change their votes depending on happiness
+    for i, a in enumerate(agents):
+
+        happiness_dict = agent_happiness[i]
+        is_happy = happiness_dict["H_si"] > HAPPINESS_THRESHOLD and happiness_dict["H_p"] > HAPPINESS_THRESHOLD
+
+        if within_limit(i):
+            yield REPORT_AGENTS, {"type": "tactical_agent", "agent": str(a), "happiness": happiness_dict,
+                                  "is_happy": is_happy}
+
+        if not is_happy:
+            tact_dictionary = analysis.get_tactical_options(a)
+
+            for key in tact_dictionary:
+
+                if len(tact_dictionary[key]) < 1:
+                    if within_limit(i):
+                        yield REPORT_AGENTS, {"type": "no_tactical_option", "agent": str(a), "happiness_type": key}
+                    continue
+
+                at_risk_count[key] += 1
+
+                if within_limit(i):
+                    for option_record in get_option_records(tact_dictionary[key], key, limit):
+                        yield REPORT_FULL, dict({"type": "tactical_option", "agent": str(a), "happiness_type": key},
+                                                **option_record)
+
+        if within_limit(i):
+            yield REPORT_AGENTS, {"type": "agent_end", "agent": str(a)}
+
+    yield REPORT_SUMMARY, {"type": "risk", "risk": {key: at_risk_count[key] / len(agents) for key in at_risk_count}}
+
+    if not tva_object.is_atva:
+        return
+
+    yield REPORT_SUMMARY, {"type": "title", "title": "ADVANCED TVA: Counter voting strategies"}
+
+    for i, a in enumerate(agents):
+
+        if not within_limit(i) or verbosity < REPORT_AGENTS:
+            break
+
+        counter_voting_set = analysis.get_counter_vote(a)
+
+        yield REPORT_AGENTS, {"type": "counter_agent", "agent": str(a)}
+
+        # element is a list = [other_agent, their prefs (list), new results (list),
+        # tactical options of agent after the other agents prefs (dict)]
+        for happiness_type in counter_voting_set:
+            yield REPORT_AGENTS, {"type": "counter_happiness_type", "agent": str(a), "happiness_type": happiness_type}
+
+            for sublist in counter_voting_set[happiness_type]:
+
+                record = {"type": "counter_vote", "agent": str(a), "happiness_type": happiness_type,
+                          "other_agent": str(sublist[0]), "other_preferences": sublist[1], "results": sublist[2],
+                          "options": None}
+
+                if sublist[1] is not None:
+                    record["options"] = get_option_records(sublist[3], happiness_type, limit)
+
+                yield REPORT_FULL, record
+
+    yield REPORT_SUMMARY, {"type": "title", "title": "ADVANCED TVA: Concurrent voting strategies"}
+
+    new_social_outcomes = analysis.get_concurrent_outcome()
+
+    for happiness_type in new_social_outcomes:
+
+        yield REPORT_SUMMARY, {"type": "concurrent_outcome", "happiness_type": happiness_type,
+                               "winner": new_social_outcomes[happiness_type][0],
+                               "results": new_social_outcomes[happiness_type][1]}
+
+        agent_list = new_social_outcomes[happiness_type][2:]
+        for j, nested_list in enumerate(agent_list):
+            if within_limit(j):
+                yield REPORT_AGENTS, {"type": "concurrent_vote", "happiness_type": happiness_type,
+                                      "agent": str(nested_list[0]), "preferences": list(nested_list[1]),
+                                      "is_original": nested_list[2]}
+
+
+def iter_report(tva_object, verbosity=REPORT_FULL, limit=None, analysis=None):
+    """
+    Streams the report of an election as structured records (dictionaries), section by section and agent by agent
+
+    :param tva_object: A TVA object, which has been run
+    :param verbosity: REPORT_SUMMARY for the election-wide records only, REPORT_AGENTS to add the records of every
+    agent, REPORT_FULL to add every tactical option
+    :param limit: The maximum number of agents (and of options per agent) to report, or None for all of them
+    :param analysis: The ElectionAnalysis of the election, created when not given
+    :return: Yields dictionaries, each with a "type" key
+    """
+    for level, record in iter_levelled_records(tva_object, verbosity, limit, analysis):
+        if level <= verbosity:
+            yield record
+
+
+def write_report(tva_object, sink, verbosity=REPORT_FULL, limit=None, analysis=None):
+    """
+    Writes the report of an election to a sink, record by record
+
+    :param tva_object: A TVA object, which has been run
+    :param sink: A sink object with a write(record) method, such as TextSink or JsonLinesSink
+    :param verbosity: The verbosity level of the report, see iter_report
+    :param limit: The maximum number of agents (and of options per agent) to report, or None for all of them
+    :param analysis: The ElectionAnalysis of the election, created when not given
+    :return: void
+    """
+    for record in iter_report(tva_object, verbosity, limit, analysis):
+        sink.write(record)
+
+
+class JsonLinesSink:
+    """
+    Sink writing every record of a report as one line of JSON
+    """
+
+    def __init__(self, stream):
+        """
+        Constructor for the JSON lines sink
+
+        :param stream: A text stream to write to, such as an open file or sys.stdout
+        """
+        self.stream = stream
+
+    def write(self, record):
+        """
+        :param record: A dictionary with a record of the report
+        :return: void
+        """
+        self.stream.write(json.dumps(record) + "\n")
+
+
+class TextSink:
+    """
+    Sink writing every record of a report as human-readable text
+    """
+
+    def __init__(self, stream):
+        """
+        Constructor for the text sink
+
+        :param stream: A text stream to write to, such as an open file or sys.stdout
+        """
+        self.stream = stream
+
+    def write(self, record):
+        """
+        :param record: A dictionary with a record of the report
+        :return: void
+        """
+        self.stream.write(getattr(self, "format_" + record["type"])(record))
+
+    def format_title(self, record):
+        return f"##### {record['title']} #####\n\n"
+
+    def format_voting_scheme(self, record):
+        return f"Voting scheme: {record['voting_scheme']}\n"
+
+    def format_preferences_header(self, record):
+        return "The voters preferences are summarised below\n"
+
+    def format_preferences(self, record):
+        return f"{record['agent']} : {record['preferences']}\n"
+
+    def format_results(self, record):
+        return f"Here are all the results\n" \
+               f"{record['results']}\n" \
+               f"The winner of this election is: {record['winner']}\n"
+
+    def format_happiness_header(self, record):
+        return "The happiness of all agents are:\n"
+
+    def format_happiness(self, record):
+        return f"{record['agent']} : {record['happiness']} %\n"
+
+    def format_overall_happiness(self, record):
+        return f"The overall happiness is: {record['overall_happiness']}\n\n"
+
+    def format_tactical_agent(self, record):
+        string = f"For {record['agent']} with initial happiness: {record['happiness']}\n"
+
+        if record["is_happy"]:
+            return string + f"{record['agent']} was happy and didn't change their preferences\n\n"
+
+        return string + f"For {record['agent']}, the tactical options are:\n"
+
+    def format_no_tactical_option(self, record):
+        return f"{record['agent']} was unhappy ({record['happiness_type']}), " \
+               f"but did not have any tactical voting strategy\n\n"
+
+    def format_tactical_option(self, record):
+        key = record["happiness_type"]
+
+        return f"Type of happiness: {key} \n" \
+               f"Option:{record['option']} new preferences: {record['preferences']} , " \
+               f"new winner: {record['winner']}, " \
+               f"new voting outcome: {record['results']}, " \
+               f"new {key}: {record['happiness']}, " \
+               f"new overall {key}: {record['overall_happiness']}\n"
+
+    def format_agent_end(self, record):
+        return "------------------------\n"
+
+    def format_risk(self, record):
+        return f"Risk based on H_p: {record['risk']['H_p'] * 100}%\n" \
+               f"Risk based on H_si: {record['risk']['H_si'] * 100}%\n\n"
+
+    def format_counter_agent(self, record):
+        return f"For {record['agent']} \n"
+
+    def format_counter_happiness_type(self, record):
+        return f"\tConsidering {record['happiness_type']}:\n\n"
+
+    def format_counter_vote(self, record):
+        agent = record["agent"]
+        other_agent = record["other_agent"]
+        happiness_type = record["happiness_type"]
+
+        if record["other_preferences"] is None:
+            return f"\t{other_agent} didn't have any tactical voting strategies, so {agent} isn't affected\n" \
+                   "--------------------------\n"
+
+        string = f"\tFor the type of happiness: {happiness_type}\n" \
+                 f"\tIf {other_agent} decides to go with new preferences: {record['other_preferences']}\n" \
+                 f"\tThe new results would be: {record['results']}\n"
+
+        if len(record["options"]) < 1:
+            return string + f"\tBut {agent} would not have any tactical options for this counter\n" \
+                            "--------------------------\n"
+
+        string += f"\tTherefore, {agent} has these tactical options:\n"
+
+        for option in record["options"]:
+            string += f"\tType of happiness {happiness_type}: Option:{option['option']} " \
+                      f"new preferences: {option['preferences']} , " \
+                      f"new winner: {option['winner']}, " \
+                      f"new voting outcome: {option['results']}, " \
+                      f"new {happiness_type}: {option['happiness']}, " \
+                      f"new overall {happiness_type}: {option['overall_happiness']}\n"
+
+        return string + "--------------------------\n"
+
+    def format_concurrent_outcome(self, record):
+        return f"For {record['happiness_type']}, the new social outcome if all agents voted concurrently:\n" \
+               f"The new winner is: {record['winner']} if the following agents voted:\n"
+
+    def format_concurrent_vote(self, record):
+        return f"{record['agent']}: {record['preferences']}, is original: {record['is_original']}\n"
@@ -0,0 +1,131 @@
+from itertools import islice
+from math import comb, factorial
+import numpy as np
+
+from voting.counted_profile import get_rankings
+
+
+def count_anonymous_profiles(n_voters, n_candidates):
+    """
+    Counts the anonymous profiles of an election: the multisets of n rankings, as every voting scheme (and every metric
+    of a sweep) is the same for two profiles that only differ in the order of the voters
+
+    :param n_voters: An integer for the number of voters
+    :param n_candidates: An integer for the number of candidates
+    :return: Returns an integer, C(m! + n - 1, n)
+    """
+    return comb(factorial(n_candidates) + n_voters - 1, n_voters)
+
+
+def get_profile_codes(n_voters, n_rankings, index):
+    """
+    Unranks an anonymous profile: finds the index-th non-decreasing sequence of Lehmer codes, in lexicographic order,
+    without enumerating the sequences before it. Going voter by voter, the sequences starting with every code are
+    counted in closed form (the combinatorial number system), and the code holding the index is found by bisection
+
+    :param n_voters: An integer for the number of voters
+    :param n_rankings: An integer for the number of rankings, m!
+    :param index: An integer for the index of the profile, below count_anonymous_profiles
+    :return: Returns a list of the Lehmer codes of the profile, in non-decreasing order
+    """
+    # Number of sequences of n_left codes, with every code from the given code up
+    def count_from(code, n_left):
+        return comb(n_rankings - code + n_left - 1, n_left)
+
+    codes = []
+    low = 0
+
+    for n_left in range(n_voters, 0, -1):
+        # The sequences starting with the codes from low up to code hold the indices below
+        # count_from(low) - count_from(code + 1), and the smallest code of which this exceeds the index is bisected
+        n_sequences = count_from(low, n_left)
+        code, high = low, n_rankings - 1
+        while code < high:
+            middle = (code + high) // 2
+            if n_sequences - count_from(middle + 1, n_left) > index:
+                high = middle
+            else:
+                code = middle + 1
+
+        index -= n_sequences - count_from(code, n_left)
+        codes.append(code)
+        low = code
+
+    return codes
+
+
+def iter_profile_codes(codes, n_rankings):
+    """
+    Enumerates the anonymous profiles from a given one on, in the order of combinations_with_replacement: the last
+    code which can still grow is raised, and all codes after it are set to its new value
+
+    :param codes: A list of the Lehmer codes of the first profile, in non-decreasing order
+    :param n_rankings: An integer for the number of rankings, m!
+    :return: Yields a tuple of Lehmer codes for every profile
+    """
+    codes = list(codes)
+
+    while True:
+        yield tuple(codes)
+
+        i = len(codes) - 1
+        while i >= 0 and codes[i] == n_rankings - 1:
+            i -= 1
+
+        if i < 0:
+            return
+
+        codes[i:] = [codes[i] + 1] * (len(codes) - i)
+
+
+def get_anonymous_profiles(n_voters, n_candidates, start, stop):
+    """
+    Enumerates a range of the anonymous profiles of an election. A profile is enumerated as a non-decreasing sequence
+    of the Lehmer codes of its rankings, so every multiset of rankings is enumerated exactly once. The first profile of
+    the range is unranked directly, so a range costs the same wherever it starts
+
+    :param n_voters: An integer for the number of voters
+    :param n_candidates: An integer for the number of candidates
+    :param start: An integer for the index of the first profile to enumerate
+    :param stop: An integer for the index after the last profile to enumerate
+    :return: Returns a tuple (profiles, codes): a numpy tensor (profiles x voters x positions) of candidate ids in
+    preference order, and a numpy matrix (profiles x voters) of the Lehmer codes of the rankings, sorted per profile
+    """
+    n_rankings = factorial(n_candidates)
+    stop = min(stop, count_anonymous_profiles(n_voters, n_candidates))
+
+    profile_codes = []
+    if start < stop:
+        profile_codes = islice(iter_profile_codes(get_profile_codes(n_voters, n_rankings, start), n_rankings),
+                               stop - start)
+
+    codes = np.array(list(profile_codes), dtype=np.int64).reshape(-1, n_voters)
+
+    return get_rankings(np.arange(n_rankings), n_candidates)[codes], codes
+
+
+def get_repeats(codes):
+    """
+    Numbers the repeated rankings of every anonymous profile: the j-th voter casting a ranking that voters before
+    them cast too gets j, and the first voter casting it gets 0
+
+    :param codes: A numpy matrix (profiles x voters) of Lehmer codes, sorted per profile
+    :return: Returns a numpy matrix (profiles x voters) of integers
+    """
+    voters = np.arange(codes.shape[1])
+
+    is_new = np.ones(codes.shape, dtype=bool)
+    is_new[:, 1:] = codes[:, 1:] != codes[:, :-1]
+
+    return voters - np.maximum.accumulate(np.where(is_new, voters, 0), axis=1)
+
+
+def get_log_voter_orders(repeats):
+    """
+    Counts the orders in which the voters can cast the rankings of every anonymous profile, n! / (k_1! * ... * k_r!)
+    for rankings cast k_1, ..., k_r times
+
+    :param repeats: A numpy matrix (profiles x voters) of repeated rankings, as returned by get_repeats
+    :return: Returns a numpy array with the logarithm of the number of orders of every profile
+    """
+    return np.log(np.arange(1, repeats.shape[1] + 1)).sum() - np.log(repeats + 1).sum(axis=1)
@@ -0,0 +1,21 @@
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def open_atomically(path, mode="w"):
+    """
+    Opens a file to replace the file at path atomically. The file is written next to its destination and only moved
+    in place once it is complete, so an interrupted write never leaves a broken file behind, and readers see either
+    the old file or the new one
+
+    :param path: A string for the path of the file to replace
+    :param mode: The mode to open the file with, "w" for text and "wb" for binary files
+    :return: Yields the open file
+    """
+    temporary_path = path + ".tmp"
+
+    with open(temporary_path, mode) as out_file:
+        yield out_file
+
+    os.replace(temporary_path, path)
@@ -0,0 +1,81 @@
+import numpy as np
+
+from agents.happiness import get_position_matrix, get_profile_happiness
+from simulation.cultures import ImpartialCulture
+from voting.positional_tally import tally_positions
+
+
+class BatchElections:
+    """
+    A batch of independent elections with the same number of candidates and voters
+
+    All ballots are stored in one tensor (elections x voters x positions) of candidate indices, so generating,
+    tallying and evaluating thousands of small elections are a handful of array operations over the election axis
+    instead of thousands of TVA and Agent objects
+    """
+
+    def __init__(self, profiles, voting_scheme):
+        """
+        Constructor for a batch of elections
+
+        :param profiles: A numpy tensor (elections x voters x positions) of candidate indices in preference order
+        :param voting_scheme: A voting scheme class (Borda, Plurality, etc.)
+        """
+        self.profiles = profiles
+        self.n_elections, self.n_voters, self.n_candidates = profiles.shape
+        self.scheme = voting_scheme
+
+        self.positions = get_position_matrix(profiles)
+        self.totals = self.tally(profiles)
+
+    @classmethod
+    def generate(cls, n_elections, n_voters, n_candidates, voting_scheme, rng, culture=None):
+        """
+        Generates a batch of elections, with the preferences of the agents drawn from a culture
+
+        :param n_elections: An integer for the number of elections
+        :param n_voters: An integer for the number of voters in every election
+        :param n_candidates: An integer for the number of candidates in every election
+        :param voting_scheme: A voting scheme class (Borda, Plurality, etc.)
+        :param rng: A numpy random Generator
+        :param culture: A Culture object, defaults to impartial culture (uniformly random preference orders)
+        :return: Returns a BatchElections object
+        """
+        if culture is None:
+            culture = ImpartialCulture()
+
+        return cls(culture.sample(rng, n_elections, n_voters, n_candidates), voting_scheme)
+
+    def tally(self, profiles):
+        """
+        Tallies every election of the batch in one go, exactly for integer scores (see tally_positions), offsetting
+        the candidate indices of each election so that every election gets its own block of bins
+
+        :param profiles: A numpy tensor (elections x voters x positions) of candidate indices in preference order
+        :return: Returns a numpy matrix (elections x candidates) of tallied votes
+        """
+        scores = self.scheme.get_score_vector(self.n_candidates)
+        offsets = np.arange(self.n_elections)[:, None, None] * self.n_candidates
+
+        totals = tally_positions((profiles + offsets).reshape(-1, self.n_candidates), scores,
+                                 self.n_elections * self.n_candidates)
+
+        return totals.reshape(self.n_elections, self.n_candidates).astype(np.int64)
+
+    def get_happiness(self):
+        """
+        :return: Returns a dictionary of numpy matrices (elections x voters), holding each agent's happiness for every
+        type of happiness
+        """
+        return get_profile_happiness(self.totals, self.profiles, self.positions)
+
+    def get_overall_happiness(self, happiness=None):
+        """
+        :param happiness: The happiness of the agents, as given by get_happiness, computed when not given
+        :return: Returns a dictionary of numpy arrays, holding the overall happiness of every election for every type
+        of happiness
+        """
+        if happiness is None:
+            happiness = self.get_happiness()
+
+        return {key: happiness[key].mean(axis=1) for key in happiness}
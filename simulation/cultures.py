@@ -0,0 +1,322 @@
+from abc import ABC, abstractmethod
+from math import factorial
+import numpy as np
+
+from agents.agent import get_ballot_dtype
+from simulation.anonymous_profiles import get_log_voter_orders, get_repeats
+from voting.counted_profile import get_rankings
+
+
+class Culture(ABC):
+    """
+    Abstract class for a preference culture, a probability distribution over the profiles of an election
+
+    A culture samples the rankings of all voters of a batch of elections at once, as array operations over a numpy
+    Generator, so generating a profile costs a handful of vectorized passes whatever the number of voters
+    """
+
+    def get_parameters(self):
+        """
+        :return: Returns a dictionary with the parameters of the culture, by name
+        """
+        return {}
+
+    def get_name(self):
+        """
+        :return: Returns a string naming the culture and its parameters, usable in file names and cache keys
+        """
+        return "_".join([self.__class__.__name__] + [f"{name}{value}" for name, value in self.get_parameters().items()])
+
+    def __repr__(self):
+        """
+        :return: Returns a string representation of the culture, such as Mallows(phi=0.5)
+        """
+        parameters = ", ".join(f"{name}={value!r}" for name, value in self.get_parameters().items())
+
+        return f"{self.__class__.__name__}({parameters})"
+
+    @abstractmethod
+    def sample(self, rng, n_elections, n_voters, n_candidates):
+        """
+        Abstract method for the cultures. Samples the profiles of a batch of independent elections
+
+        :param rng: A numpy random Generator
+        :param n_elections: An integer for the number of elections
+        :param n_voters: An integer for the number of voters in every election
+        :param n_candidates: An integer for the number of candidates in every election
+        :return: Returns a numpy tensor (elections x voters x positions) of candidate ids in preference order
+        """
+        pass
+
+    def sample_profile(self, rng, n_voters, n_candidates):
+        """
+        Samples the profile of a single election
+
+        :param rng: A numpy random Generator
+        :param n_voters: An integer for the number of voters
+        :param n_candidates: An integer for the number of candidates
+        :return: Returns a numpy matrix (voters x positions) of candidate ids in preference order
+        """
+        return self.sample(rng, 1, n_voters, n_candidates)[0]
+
+    def get_ranking_probabilities(self, n_candidates):
+        """
+        Computes the probability that a voter draws every ranking, for the cultures in which the voters draw their
+        rankings independently of each other
+
+        :param n_candidates: An integer for the number of candidates
+        :return: Returns a numpy array with the probability of every ranking, indexed by Lehmer code - raises an
+        exception if the voters of the culture do not draw their rankings independently
+        """
+        raise Exception(f"The voters of {self!r} do not draw their rankings independently")
+
+    def get_profile_probabilities(self, codes, n_candidates):
+        """
+        Computes the probability of anonymous profiles, which is the probability of the rankings of the voters summed
+        over every order of the voters casting them
+
+        :param codes: A numpy matrix (profiles x voters) of the Lehmer codes of the rankings, sorted per profile
+        :param n_candidates: An integer for the number of candidates
+        :return: Returns a numpy array with the probability of every profile
+        """
+        with np.errstate(divide="ignore"):
+            log_probabilities = np.log(self.get_ranking_probabilities(n_candidates))[codes].sum(axis=1)
+
+        return np.exp(get_log_voter_orders(get_repeats(codes)) + log_probabilities)
+
+
+class ImpartialCulture(Culture):
+    """
+    Impartial culture: every voter draws a ranking uniformly at random, independently of the others. A ranking is the
+    argsort of m uniform random keys
+    """
+
+    def sample(self, rng, n_elections, n_voters, n_candidates):
+        keys = rng.random((n_elections, n_voters, n_candidates))
+
+        return np.argsort(keys, axis=2).astype(get_ballot_dtype(n_candidates))
+
+    def get_ranking_probabilities(self, n_candidates):
+        n_rankings = factorial(n_candidates)
+
+        return np.full(n_rankings, 1 / n_rankings)
+
+
+class Mallows(Culture):
+    """
+    Mallows model: the probability of a ranking decreases by a factor phi for every pair of candidates it orders
+    differently from a reference ranking. phi = 1 is impartial culture, and phi = 0 gives every voter the reference
+
+    Rankings are drawn with the repeated insertion model: the candidates of the reference are inserted one by one,
+    the i-th one at position j (of i + 1) with a probability proportional to phi^(i - j). The insertions of all voters
+    are drawn at once, position by position
+    """
+
+    def __init__(self, phi=0.5, reference=None):
+        """
+        Constructor for the Mallows model
+
+        :param phi: The dispersion of the model, between 0 and 1
+        :param reference: A sequence with the reference ranking of candidate ids, defaults to the candidates in the
+        order of their ids
+        """
+        if not 0 <= phi <= 1:
+            raise Exception("The dispersion of a Mallows model must be between 0 and 1")
+
+        self.phi = phi
+        self.reference = None if reference is None else tuple(reference)
+
+    def get_parameters(self):
+        parameters = {"phi": self.phi}
+        if self.reference is not None:
+            parameters["reference"] = self.reference
+
+        return parameters
+
+    def get_reference(self, n_candidates):
+        """
+        :param n_candidates: An integer for the number of candidates
+        :return: Returns a numpy array with the reference ranking of candidate ids - raises an exception if it does
+        not rank all candidates
+        """
+        reference = np.arange(n_candidates) if self.reference is None else np.array(self.reference)
+
+        if len(reference) != n_candidates:
+            raise Exception(f"The reference ranking must rank all {n_candidates} candidates")
+
+        return reference
+
+    def sample(self, rng, n_elections, n_voters, n_candidates):
+        n_rankings = n_elections * n_voters
+        reference = self.get_reference(n_candidates)
+
+        # Position of every inserted candidate of the reference, in the ranking built so far
+        positions = np.zeros((n_rankings, n_candidates), dtype=np.int64)
+        draws = rng.random((n_rankings, n_candidates))
+
+        for i in range(n_candidates):
+            weights = self.phi ** np.arange(i, -1, -1, dtype=np.float64)
+            cumulative = np.cumsum(weights) / weights.sum()
+            insertion = np.minimum(np.searchsorted(cumulative, draws[:, i], side="right"), i)
+
+            positions[:, :i] += positions[:, :i] >= insertion[:, None]
+            positions[:, i] = insertion
+
+        rankings = reference[np.argsort(positions, axis=1)]
+
+        return rankings.reshape(n_elections, n_voters, n_candidates).astype(get_ballot_dtype(n_candidates))
+
+    def get_ranking_probabilities(self, n_candidates):
+        # Place of every candidate of every ranking in the reference, of which the inversions are the pairs the
+        # ranking orders differently from the reference
+        places = np.argsort(self.get_reference(n_candidates))[get_rankings(np.arange(factorial(n_candidates)),
+                                                                           n_candidates)]
+        later = np.triu(np.ones((n_candidates, n_candidates), dtype=bool), k=1)
+        distances = ((places[:, :, None] > places[:, None, :]) & later).sum(axis=(1, 2))
+
+        weights = self.phi ** distances.astype(np.float64)
+
+        return weights / weights.sum()
+
+
+class Urn(Culture):
+    """
+    Polya-Eggenberger urn: the urn starts with one ball for every ranking, and every drawn ball is put back together
+    with alpha * m! copies. alpha = 0 is impartial culture, and a larger alpha makes voters copy each other more
+
+    Voter i thus draws a fresh uniform ranking with probability 1 / (1 + alpha * i), and otherwise copies one of the
+    i voters before them. Which voters draw fresh rankings and whom the others copy are drawn at once, and the copies
+    are resolved by pointer jumping, so the urn is sampled without a loop over the voters
+    """
+
+    def __init__(self, alpha=0.1):
+        """
+        Constructor for the urn
+
+        :param alpha: The number of copies put back with every drawn ball, relative to the m! initial balls
+        """
+        if alpha < 0:
+            raise Exception("The contagion of an urn cannot be negative")
+
+        self.alpha = alpha
+
+    def get_parameters(self):
+        return {"alpha": self.alpha}
+
+    def get_alpha(self, n_candidates):
+        """
+        :param n_candidates: An integer for the number of candidates
+        :return: Returns the number of copies put back with every drawn ball, relative to the initial balls
+        """
+        return self.alpha
+
+    def sample(self, rng, n_elections, n_voters, n_candidates):
+        fresh_rankings = ImpartialCulture().sample(rng, n_elections, n_voters, n_candidates)
+
+        voters = np.arange(n_voters)
+        is_fresh = rng.random((n_elections, n_voters)) * (1 + self.get_alpha(n_candidates) * voters) < 1
+        copied = np.floor(rng.random((n_elections, n_voters)) * voters).astype(np.int64)
+
+        # Every voter points at the voter they copy, and voters drawing a fresh ranking at themselves. Following
+        # the pointers until they stop leads every voter to the fresh ranking they end up with
+        sources = np.where(is_fresh, voters, copied)
+        while True:
+            next_sources = np.take_along_axis(sources, sources, axis=1)
+            if np.array_equal(next_sources, sources):
+                break
+            sources = next_sources
+
+        return np.take_along_axis(fresh_rankings, sources[:, :, None], axis=1)
+
+    def get_profile_probabilities(self, codes, n_candidates):
+        n_rankings = factorial(n_candidates)
+        copies = self.get_alpha(n_candidates) * n_rankings
+        repeats = get_repeats(codes)
+
+        # Voter t draws a ranking which j voters before them drew with probability (1 + j * copies) / (m! + t * copies)
+        draws = np.log(1 + repeats * copies).sum(axis=1)
+        balls = np.log(n_rankings + np.arange(codes.shape[1]) * copies).sum()
+
+        return np.exp(get_log_voter_orders(repeats) + draws - balls)
+
+
+class ImpartialAnonymousCulture(Urn):
+    """
+    Impartial anonymous culture: every anonymous profile (every multiset of rankings) is equally likely. This is the
+    urn putting back a single copy of every drawn ball
+    """
+
+    def __init__(self):
+        """
+        Constructor for the impartial anonymous culture
+        """
+        super().__init__(0)
+
+    def get_parameters(self):
+        return {}
+
+    def get_alpha(self, n_candidates):
+        return 1 / factorial(n_candidates)
+
+
+class SinglePeaked(Culture):
+    """
+    Uniform single-peaked culture: every voter draws one of the 2^(m-1) rankings which are single-peaked with respect
+    to an axis, uniformly at random
+
+    A single-peaked ranking is built from the bottom: the last place goes to one of the two candidates at the ends
+    of the part of the axis which is left, chosen with a coin flip, until only the peak is left
+    """
+
+    def __init__(self, axis=None):
+        """
+        Constructor for the single-peaked culture
+
+        :param axis: A sequence with the candidate ids in the order of the axis, defaults to the order of their ids
+        """
+        self.axis = None if axis is None else tuple(axis)
+
+    def get_parameters(self):
+        return {} if self.axis is None else {"axis": self.axis}
+
+    def get_axis(self, n_candidates):
+        """
+        :param n_candidates: An integer for the number of candidates
+        :return: Returns a numpy array with the candidate ids in the order of the axis - raises an exception if it
+        does not hold all candidates
+        """
+        axis = np.arange(n_candidates) if self.axis is None else np.array(self.axis)
+
+        if len(axis) != n_candidates:
+            raise Exception(f"The axis must hold all {n_candidates} candidates")
+
+        return axis
+
+    def sample(self, rng, n_elections, n_voters, n_candidates):
+        n_rankings = n_elections * n_voters
+        axis = self.get_axis(n_candidates)
+
+        takes_left = rng.random((n_rankings, n_candidates - 1)) < 0.5
+
+        left = np.zeros(n_rankings, dtype=np.int64)
+        right = np.full(n_rankings, n_candidates - 1, dtype=np.int64)
+        rankings = np.empty((n_rankings, n_candidates), dtype=np.int64)
+
+        for position in range(n_candidates - 1, 0, -1):
+            take_left = takes_left[:, position - 1]
+            rankings[:, position] = np.where(take_left, left, right)
+            left += take_left
+            right -= ~take_left
+
+        rankings[:, 0] = left
+
+        return axis[rankings].reshape(n_elections, n_voters, n_candidates).astype(get_ballot_dtype(n_candidates))
+
+    def get_ranking_probabilities(self, n_candidates):
+        # A ranking is single-peaked if its first k candidates are next to each other on the axis, for every k
+        places = np.argsort(self.get_axis(n_candidates))[get_rankings(np.arange(factorial(n_candidates)),
+                                                                      n_candidates)]
+        spans = np.maximum.accumulate(places, axis=1) - np.minimum.accumulate(places, axis=1)
+        is_single_peaked = (spans == np.arange(n_candidates)).all(axis=1)
+
+        return is_single_peaked / is_single_peaked.sum()
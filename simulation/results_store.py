@@ -0,0 +1,84 @@
+import numpy as np
+
+from simulation.atomic_file import open_atomically
+
+HAPPINESS_TYPES = ["H_p", "H_si"]
+
+# Every metric of a sweep cell is stored once per type of happiness, as "<metric>_<happiness type>"
+METRICS = ["basic_average_overall_happiness", "average_tactical_voting_risk", "basic_average_happiness_increase",
+           "conc_average_overall_happiness", "conc_average_voting_happiness_increases",
+           "counter_average_voting_dict_overall", "counter_average_voting_dict_increases"]
+
+METRIC_COLUMNS = [f"{metric}_{key}" for metric in METRICS for key in HAPPINESS_TYPES]
+
+# Next to its mean, every metric stores the half-width of its confidence interval as "<metric column>_half_width"
+INTERVAL_COLUMNS = [f"{column}_half_width" for column in METRIC_COLUMNS]
+
+KEY_COLUMNS = ["voting_scheme", "n_candidates", "n_voters", "tests"]
+
+
+def write_results(path, rows):
+    """
+    Writes the rows of a sweep to a columnar store: a NumPy .npz file holding one typed array per column, with one row
+    per (voting scheme, candidates, voters) cell. Metrics that were not computed for a cell are stored as NaN, and so
+    are the intervals of metrics with fewer than two values
+
+    The store is written atomically (see open_atomically)
+
+    :param path: A string for the path of the .npz file
+    :param rows: A list of dictionaries, mapping every key column, metric column and interval column to its value
+    :return: void
+    """
+    columns = {"voting_scheme": np.array([row["voting_scheme"] for row in rows], dtype=str)}
+
+    for column in KEY_COLUMNS[1:]:
+        columns[column] = np.array([row[column] for row in rows], dtype=np.int64)
+
+    for column in METRIC_COLUMNS + INTERVAL_COLUMNS:
+        columns[column] = np.array([row[column] for row in rows], dtype=np.float64)
+
+    with open_atomically(path, "wb") as out_file:
+        np.savez(out_file, **columns)
+
+
+def read_results(path):
+    """
+    Reads a columnar store
+
+    :param path: A string for the path of the .npz file
+    :return: Returns a dictionary mapping every column to a numpy array
+    """
+    with np.load(path) as store:
+        return {column: store[column] for column in store.files}
+
+
+def load_results(path, voting_scheme=None):
+    """
+    Loads a columnar store into ready-to-plot grids, indexed by (candidates, voters)
+
+    :param path: A string for the path of the .npz file
+    :param voting_scheme: A string to only load the cells of one voting scheme, all cells are loaded if not given
+    :return: Returns a tuple (candidates, voters, grids), where candidates and voters are sorted numpy arrays of the
+    grid axes, and grids maps every metric column and interval column to a matrix (candidates x voters), holding NaN
+    for missing cells
+    """
+    columns = read_results(path)
+
+    if voting_scheme is None:
+        rows = np.ones(len(columns["voting_scheme"]), dtype=bool)
+    else:
+        rows = columns["voting_scheme"] == voting_scheme
+
+    candidates = np.unique(columns["n_candidates"][rows])
+    voters = np.unique(columns["n_voters"][rows])
+
+    i = np.searchsorted(candidates, columns["n_candidates"][rows])
+    j = np.searchsorted(voters, columns["n_voters"][rows])
+
+    grids = {}
+    # Stores written before the intervals were kept only hold the metric columns
+    for column in [column for column in METRIC_COLUMNS + INTERVAL_COLUMNS if column in columns]:
+        grids[column] = np.full((len(candidates), len(voters)), np.nan)
+        grids[column][i, j] = columns[column][rows]
+
+    return candidates, voters, grids
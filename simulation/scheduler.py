@@ -0,0 +1,312 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+import numpy as np
+
+from simulation.atomic_file import open_atomically
+
+# Number of chunks per worker the work left is split into, so the chunks left at the end of a sweep are small
+CHUNKS_PER_WORKER = 8
+
+# Number of chunks per worker kept in the queue of the pool, so a worker finishing a chunk never waits for the next
+QUEUED_PER_WORKER = 2
+
+# Most timings kept per cost key; older timings are dropped, so the model follows changes to the TVA
+MAX_OBSERVATIONS = 1000
+
+# Weight of the prior exponents against the timings, in timings
+PRIOR_WEIGHT = 1.0
+
+# Prior of the model, (log seconds per election, exponent of the candidates, exponent of the voters), by whether the
+# advanced TVA is run. The basic TVA grows slowly, the advanced TVA analyses every agent against every other
+PRIORS = {False: (np.log(1e-4), 0.5, 0.5), True: (np.log(1e-4), 1.5, 1.5)}
+
+
+def run_task_chunk(chunk):
+    """
+    Runs a chunk of the tasks of a sweep cell and times it. This is the unit of work handed to the worker processes
+    by the scheduler
+
+    :param chunk: A tuple (task_function, tasks)
+    :return: Returns a tuple (seconds, outputs) with the time it took to run the chunk and the output of every task
+    """
+    task_function, tasks = chunk
+
+    start = time.perf_counter()
+    outputs = [task_function(task) for task in tasks]
+
+    return time.perf_counter() - start, outputs
+
+
+class CostModel:
+    """
+    Predicts how long the elections of a sweep cell take to run
+
+    The time of an election is modelled as a power law of the number of candidates m and of voters n, c * m^a * n^b,
+    fitted by least squares on a log scale to the timings of the chunks run so far. There is one model per cost key,
+    a tuple (engine, voting_scheme, is_advanced), and a prior on the exponents (by whether the advanced TVA is run)
+    keeps the model sensible before the first timings come in. The timings are persisted, so a sweep starts from the
+    calibration of the sweeps before it
+    """
+
+    def __init__(self, observations=None):
+        """
+        Constructor for the cost model
+
+        :param observations: A dictionary mapping the name of every cost key to a list of timings [m, n, seconds per
+        election]
+        """
+        self.observations = {} if observations is None else observations
+        self.coefficients = {}
+
+    @classmethod
+    def load(cls, path):
+        """
+        :param path: A string for the path of the JSON file holding the timings
+        :return: Returns a CostModel object, without timings if the file does not exist
+        """
+        if not os.path.exists(path):
+            return cls()
+
+        with open(path, "r") as in_file:
+            return cls(json.load(in_file))
+
+    def save(self, path):
+        """
+        Persists the timings, atomically (see open_atomically)
+
+        :param path: A string for the path of the JSON file holding the timings
+        :return: void
+        """
+        with open_atomically(path) as out_file:
+            json.dump(self.observations, out_file)
+
+    @staticmethod
+    def get_name(key):
+        """
+        :param key: A cost key, a tuple (engine, voting_scheme, is_advanced)
+        :return: Returns the string name of the cost key, under which its timings are persisted
+        """
+        engine, voting_scheme, is_advanced = key
+
+        return f"{engine}/{voting_scheme}/{'advanced' if is_advanced else 'basic'}"
+
+    def observe(self, key, n_candidates, n_voters, n_elections, seconds):
+        """
+        Adds the timing of a chunk of elections to the model
+
+        :param key: A cost key, a tuple (engine, voting_scheme, is_advanced)
+        :param n_candidates: An integer for the number of candidates
+        :param n_voters: An integer for the number of voters
+        :param n_elections: An integer for the number of elections of the chunk
+        :param seconds: The time it took to run the chunk
+        :return: void
+        """
+        if n_elections == 0 or seconds <= 0:
+            return
+
+        observations = self.observations.setdefault(self.get_name(key), [])
+        observations.append([n_candidates, n_voters, seconds / n_elections])
+        del observations[:-MAX_OBSERVATIONS]
+
+        self.coefficients.pop(key, None)
+
+    def get_coefficients(self, key):
+        """
+        Fits the model of a cost key to its timings, with the prior exponents as extra observations
+
+        :param key: A cost key, a tuple (engine, voting_scheme, is_advanced)
+        :return: Returns a numpy array (log seconds per election, exponent of the candidates, exponent of the voters)
+        """
+        if key in self.coefficients:
+            return self.coefficients[key]
+
+        _, _, is_advanced = key
+
+        prior = np.array(PRIORS[is_advanced])
+        observations = np.array(self.observations.get(self.get_name(key), []), dtype=np.float64).reshape(-1, 3)
+
+        if len(observations) == 0:
+            coefficients = prior
+        else:
+            design = np.column_stack([np.ones(len(observations)), np.log(observations[:, :2])])
+            targets = np.log(observations[:, 2])
+
+            # The prior pulls the exponents (not the scale) towards their prior values
+            prior_design = np.sqrt(PRIOR_WEIGHT) * np.array([[0, 1, 0], [0, 0, 1]])
+            prior_targets = np.sqrt(PRIOR_WEIGHT) * prior[1:]
+
+            coefficients, *_ = np.linalg.lstsq(np.vstack([design, prior_design]),
+                                               np.concatenate([targets, prior_targets]), rcond=None)
+
+        self.coefficients[key] = coefficients
+
+        return coefficients
+
+    def predict(self, key, n_candidates, n_voters, n_elections=1):
+        """
+        :param key: A cost key, a tuple (engine, voting_scheme, is_advanced)
+        :param n_candidates: An integer for the number of candidates
+        :param n_voters: An integer for the number of voters
+        :param n_elections: An integer for the number of elections
+        :return: Returns the predicted time in seconds to run the elections
+        """
+        log_scale, candidates_exponent, voters_exponent = self.get_coefficients(key)
+
+        return n_elections * float(np.exp(log_scale + candidates_exponent * np.log(n_candidates)
+                                          + voters_exponent * np.log(n_voters)))
+
+
+class SweepScheduler:
+    """
+    Runs the tasks of the cells of a sweep on a pool of worker processes, keeping all workers busy until the end
+
+    The cost of a cell varies by orders of magnitude across the grid, so the tasks are not handed out in grid order.
+    Every job (the tasks of a cell, or of a round of an adaptive cell) is handed out in chunks of consecutive tasks,
+    always from the job with the most predicted work left, and every chunk holds about the same share of all work
+    left. Large cells are then spread over all workers early on, the small cells fill the gaps at the end, and the
+    chunks get smaller as the sweep runs out of work. Jobs can be added while the scheduler runs, such as the next
+    round of a cell as soon as its last round is back, so no worker waits for the other cells. Every chunk is timed
+    to calibrate the cost model as the sweep goes
+    """
+
+    def __init__(self, cost_model, executor=None, workers=1):
+        """
+        Constructor for the scheduler
+
+        :param cost_model: A CostModel object
+        :param executor: A ProcessPoolExecutor running the chunks, the chunks run in this process when not given
+        :param workers: An integer for the number of worker processes of the executor
+        """
+        self.cost_model = cost_model
+        self.executor = executor
+        self.workers = workers
+
+        # Every job which is not finished, with the index of its next task to hand out, its elections not handed out
+        # yet, the outputs of its chunks and its number of chunks which are not finished, by job id
+        self.jobs = {}
+
+    def add(self, job):
+        """
+        Adds a job to the scheduler
+
+        :param job: A job (job_id, (cost key, n_candidates, n_voters), tasks, task_sizes), where every task returns a
+        list of outputs and task_sizes holds the number of elections of every task
+        :return: void
+        """
+        job_id, _, tasks, task_sizes = job
+
+        if job_id in self.jobs:
+            raise Exception(f"Job {job_id} is already scheduled")
+
+        self.jobs[job_id] = [job, 0, sum(task_sizes), [], 0]
+
+    def predict(self, job, n_elections):
+        """
+        :param job: A job, as passed to add
+        :param n_elections: An integer for a number of elections of the job
+        :return: Returns the predicted time in seconds to run the elections
+        """
+        _, (key, n_candidates, n_voters), _, _ = job
+
+        return self.cost_model.predict(key, n_candidates, n_voters, n_elections)
+
+    def get_next_chunk(self):
+        """
+        Cuts the next chunk from the job with the most predicted work left
+
+        :return: Returns a tuple (job_id, chunk index, start, end) with the range of the tasks of the chunk in its job,
+        or None if every task has been handed out
+        """
+        pending = [state for state in self.jobs.values() if state[1] < len(state[0][2])]
+        if not pending:
+            return None
+
+        costs = [self.predict(state[0], state[2]) for state in pending]
+        chunk_cost = sum(costs) / (self.workers * CHUNKS_PER_WORKER)
+
+        state = pending[int(np.argmax(costs))]
+        job, start, _, outputs, _ = state
+        job_id, _, tasks, task_sizes = job
+        election_cost = self.predict(job, 1)
+
+        end = start + 1
+        n_elections = task_sizes[start]
+        while end < len(tasks) and election_cost * n_elections < chunk_cost:
+            n_elections += task_sizes[end]
+            end += 1
+
+        state[1] = end
+        state[2] -= n_elections
+        state[4] += 1
+        outputs.append(None)
+
+        return job_id, len(outputs) - 1, start, end
+
+    def get_tasks(self, chunk):
+        """
+        :param chunk: A chunk, as returned by get_next_chunk
+        :return: Returns the list of the tasks of the chunk
+        """
+        job_id, _, start, end = chunk
+
+        return self.jobs[job_id][0][2][start:end]
+
+    def finish_chunk(self, chunk, seconds, chunk_outputs):
+        """
+        Stores the outputs of a chunk, and times it
+
+        :param chunk: A chunk, as returned by get_next_chunk
+        :param seconds: The time it took to run the chunk
+        :param chunk_outputs: A list with the outputs of every task of the chunk
+        :return: Returns a tuple (job_id, outputs) if the job is finished, None otherwise
+        """
+        job_id, c, start, end = chunk
+
+        state = self.jobs[job_id]
+        job, next_task, _, outputs, _ = state
+        _, (key, n_candidates, n_voters), all_tasks, task_sizes = job
+
+        self.cost_model.observe(key, n_candidates, n_voters, sum(task_sizes[start:end]), seconds)
+
+        outputs[c] = chunk_outputs
+        state[4] -= 1
+
+        if state[4] > 0 or next_task < len(all_tasks):
+            return None
+
+        del self.jobs[job_id]
+
+        return job_id, [output for chunk_outputs in outputs for task_outputs in chunk_outputs
+                        for output in task_outputs]
+
+    def run(self, task_function):
+        """
+        Runs the tasks of the jobs, and yields every job as soon as all its tasks are run. Jobs added in between are
+        run too
+
+        :param task_function: The function running a single task
+        :return: Yields a tuple (job_id, outputs) for every job, with the outputs of its tasks in order
+        """
+        if self.executor is None:
+            while (chunk := self.get_next_chunk()) is not None:
+                job = self.finish_chunk(chunk, *run_task_chunk((task_function, self.get_tasks(chunk))))
+                if job is not None:
+                    yield job
+
+            return
+
+        running = {}
+        while True:
+            while len(running) < self.workers * QUEUED_PER_WORKER and (chunk := self.get_next_chunk()) is not None:
+                running[self.executor.submit(run_task_chunk, (task_function, self.get_tasks(chunk)))] = chunk
+
+            if not running:
+                return
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = self.finish_chunk(running.pop(future), *future.result())
+                if job is not None:
+                    yield job
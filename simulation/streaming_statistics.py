@@ -0,0 +1,70 @@
+from math import sqrt
+from statistics import NormalDist
+import numpy as np
+
+
+def get_z_score(confidence):
+    """
+    :param confidence: The confidence level of an interval, between 0 and 1
+    :return: Returns the number of standard errors on either side of the mean of a normal confidence interval
+    """
+    if not 0 < confidence < 1:
+        raise Exception("The confidence level of an interval must be between 0 and 1")
+
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+class StreamingStatistics:
+    """
+    Running mean and variance of a metric, updated one value at a time with Welford's algorithm (West's, for weighted
+    values). Unlike sums of values and of squared values, the updates do not lose precision when the variance is
+    small next to the mean, and no value has to be kept
+    """
+
+    def __init__(self):
+        """
+        Constructor for the statistics of a metric without values
+        """
+        self.count = 0
+        self.weight = 0
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+
+    def add(self, value, weight=1):
+        """
+        Adds a value to the statistics
+
+        :param value: The value of the metric
+        :param weight: The weight of the value, every value counts once when not given
+        :return: void
+        """
+        self.count += 1
+        self.weight += weight
+
+        if self.weight == 0:
+            return
+
+        deviation = value - self.mean
+        self.mean += deviation * weight / self.weight
+        self.squared_deviations += weight * deviation * (value - self.mean)
+
+    def get_mean(self):
+        """
+        :return: Returns the weighted mean of the values, NaN if there are none
+        """
+        return self.mean if self.weight > 0 else np.nan
+
+    def get_variance(self):
+        """
+        :return: Returns the unbiased variance of values which count once, NaN if there are fewer than two
+        """
+        return self.squared_deviations / (self.count - 1) if self.count > 1 else np.nan
+
+    def get_half_width(self, z_score):
+        """
+        Computes the half-width of the normal confidence interval around the mean of values which count once
+
+        :param z_score: The number of standard errors on either side of the mean, as returned by get_z_score
+        :return: Returns the half-width of the interval, NaN if there are fewer than two values
+        """
+        return z_score * sqrt(self.get_variance() / self.count) if self.count > 1 else np.nan
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+
+from simulation.atomic_file import open_atomically
+
+
+class SweepCache:
+    """
+    Content-addressed cache of finished sweep cells
+
+    Every cell is stored in its own file, named after a hash of everything its results depend on. A cell is
+    persisted as soon as it is finished, so an interrupted sweep resumes where it stopped, and a sweep that is
+    extended with new cells only computes those
+    """
+
+    def __init__(self, folder):
+        """
+        Constructor for the sweep cache
+
+        :param folder: A string for the folder in which the cells are stored, created if it does not exist
+        """
+        self.folder = folder
+
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+    @staticmethod
+    def get_key(voting_scheme, n_candidates, n_voters, tests, seed, is_advanced, engine, engine_version, culture,
+                stopping):
+        """
+        Computes the key of a sweep cell
+
+        :param voting_scheme: A string indicating the type of voting
+        :param n_candidates: An integer for the number of candidates
+        :param n_voters: An integer for the number of voters
+        :param tests: An integer for the number of elections run for the cell
+        :param seed: An integer master seed of the sweep
+        :param is_advanced: A boolean, True if the advanced TVA is run
+        :param engine: A string for the engine running the elections
+        :param engine_version: The version of the engine, which changes whenever the results of a cell change
+        :param culture: A string describing the culture the preferences are drawn from, with its parameters
+        :param stopping: A JSON serialisable description of when the cell stops and of its confidence intervals
+        :return: Returns a string with the hexadecimal hash of the cell
+        """
+        content = json.dumps([voting_scheme, n_candidates, n_voters, tests, seed, is_advanced, engine,
+                              engine_version, culture, stopping])
+
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get_path(self, key):
+        """
+        :param key: A string key of a sweep cell
+        :return: Returns the path of the file holding the cell
+        """
+        return os.path.join(self.folder, key + ".json")
+
+    def get(self, key):
+        """
+        Gets a finished sweep cell
+
+        :param key: A string key of a sweep cell
+        :return: Returns the row of the cell, or None if the cell has not been finished
+        """
+        path = self.get_path(key)
+
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "r") as in_file:
+            return json.load(in_file)
+
+    def put(self, key, row):
+        """
+        Persists a finished sweep cell, atomically (see open_atomically)
+
+        :param key: A string key of a sweep cell
+        :param row: A dictionary with the row of the cell in the results store
+        :return: void
+        """
+        with open_atomically(self.get_path(key)) as out_file:
+            json.dump(row, out_file)
@@ -0,0 +1,109 @@
+class GreedyScoring:
+    """
+    Class for the greedy single-manipulator decision engine for positional scoring rules
+
+    The manipulator puts the target candidate first, and then fills the remaining positions from the top, handing the
+    highest remaining score to the candidate that can take it without threatening the target. As the scores do not
+    increase down the ballot, a candidate that can take a score can take every lower one too, so sorting the candidates
+    by leeway decides this in O(m log m), and also gives one witness ballot whenever the manipulation is feasible
+    """
+
+    def __init__(self, scores):
+        """
+        Constructor for the greedy engine
+
+        :param scores: the score of every position of a ballot, in non-increasing order
+        """
+        self.scores = [int(score) for score in scores]
+
+    def get_leeway(self, candidate, prefs, votes):
+        """
+        Gets how many points every other candidate can receive from the manipulator, without ending above the target
+
+        :param candidate: the target candidate, which the manipulator puts first
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes, with the candidates in the order of their ids
+        :return: list of candidate-leeway pairs in decreasing order of leeway
+        """
+        up_bound = votes[candidate] + self.scores[0]
+
+        # Ties go to the candidate with the lowest id, and the votes hold the candidates in the order of their ids
+        ids = {x: i for i, x in enumerate(votes)}
+
+        lee = []
+        for x in prefs:
+            if x != candidate:
+                # if the target wins the tie, x can get up to the same score, else up to 1 below the same score
+                if ids[candidate] < ids[x]:
+                    lee.append((x, up_bound - votes[x]))
+                else:
+                    lee.append((x, up_bound - votes[x] - 1))
+
+        return sorted(lee, key=lambda k: k[1], reverse=True)
+
+    def get_winning_option(self, sorted_leeway):
+        """
+        Decides if the target can be made to win: the candidate with the i-th most leeway gets the i-th highest
+        remaining score, which is feasible if every candidate can take its score
+
+        :param sorted_leeway: list of candidate-leeway pairs in decreasing order of leeway
+        :return: the witness, a list of candidate-leeway pairs from the second preference down, or None if the target
+        cannot win
+        """
+        for i in range(len(sorted_leeway)):
+            if sorted_leeway[i][1] < self.scores[i + 1]:
+                return None
+
+        return list(sorted_leeway)
+
+    def get_losers(self, sorted_leeway):
+        """
+        Finds the largest set of candidates that can be kept below the target. Going from the least leeway up, every
+        candidate that can take the next lowest score is put below the target
+
+        :param sorted_leeway: list of candidate-leeway pairs in decreasing order of leeway
+        :return: list of candidate-leeway pairs kept below the target, from the lowest score up
+        """
+        losers = []
+        for pair in reversed(sorted_leeway):
+            if pair[1] >= self.scores[-1 - len(losers)]:
+                losers.append(pair)
+
+        return losers
+
+    def get_highest_position_option(self, sorted_leeway):
+        """
+        Builds a witness for the highest position of the target: the candidates that cannot be kept below the target
+        take the highest scores, and the losers the lowest ones
+
+        :param sorted_leeway: list of candidate-leeway pairs in decreasing order of leeway
+        :return: the witness, a list of candidate-leeway pairs from the second preference down
+        """
+        losers = self.get_losers(sorted_leeway)
+        loser_names = {pair[0] for pair in losers}
+
+        return [pair for pair in sorted_leeway if pair[0] not in loser_names] + losers[::-1]
+
+    def can_win(self, candidate, prefs, votes):
+        """
+        Checks if an agent can make a specific candidate win
+
+        :param candidate: the candidate to get to 1st place
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :return: True if the candidate can be made to win
+        """
+        return self.get_winning_option(self.get_leeway(candidate, prefs, votes)) is not None
+
+    def get_highest_position(self, candidate, prefs, votes):
+        """
+        Finds the highest position in the results the candidate can be made to achieve
+
+        :param candidate: the candidate to raise
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :return: the index of the candidate in the results, 0 being the winner
+        """
+        sorted_lee = self.get_leeway(candidate, prefs, votes)
+
+        return len(sorted_lee) - len(self.get_losers(sorted_lee))
@@ -0,0 +1,270 @@
+from itertools import combinations, islice
+import time
+from strategies.greedy_scoring import GreedyScoring
+
+
+class Strategies_scoring:
+    """
+    Class for the voting strategy of a positional scoring rule
+
+    Tactical options are enumerated lazily, so that only as many are built as the budget of the strategy allows. The
+    budget is a maximum number of options, a maximum time per enumeration, or both. Whether an option exists at all
+    is decided by the greedy engine, so with a budget of one option its witness is returned without enumerating.
+
+    Positions with the same score form a level, and the candidates of a level are only enumerated as a set (kept in
+    order of leeway), as the order within a level does not change the outcome. Branches whose remaining positions can
+    no longer be filled are pruned, so that every branch of the enumeration ends in a tactical option
+    """
+
+
+    def __init__(self, scores, opt_limit, time_limit=None):
+        """
+        Constructor for the scoring rule voting strategy
+
+        :param scores: the score of every position of a ballot, in non-increasing order
+        :param opt_limit: maximum number of tactical voting options, or None for no limit
+        :param time_limit: maximum number of seconds spent enumerating the options of one happiness metric, or None for
+        no limit
+        """
+        self.scores = [int(score) for score in scores]
+        self.opt_limit = opt_limit
+        self.time_limit = time_limit
+        self.engine = GreedyScoring(self.scores)
+
+    def check_if_best(self, agent, remainder_votes, pref_pos, winner):
+        """
+        Checks if an agent can change voting strategy to find a better outcome
+
+        :param agent: the agent changing their voting strategy
+        :param remainder_votes: tallied votes of all other agents except ours
+        :param pref_pos: position from all tallied votes of highest preferred candidate of agent
+        :return [res_pref, res_si]: list containing the new preference dictionaries for both happiness metrics
+        """
+
+        new_votes = remainder_votes.copy()
+        prefs = agent.get_preferences()
+        res_si = self.highest_position(next(iter(prefs)), prefs, new_votes, pref_pos)
+        for x in prefs:
+            if x == winner:
+                return [[], res_si]
+            res_pref = self.check_winner_possible(x, prefs, new_votes)
+            if len(res_pref) > 0:
+                return [res_pref, res_si]
+        return [[], []]
+
+    def check_winner_possible(self, candidate, prefs, votes):
+        """
+        Checks if an agent can change voting strategy to make a specific candidate win,
+        which is what gives the "my preference" happiness metric its score
+
+        :param candidate: the candidate to get to 1st place
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :return new_prefs: list of new preferences for tactical voting, within the budget
+        """
+        if self.opt_limit == 1:
+            return self.get_winning_ballots(candidate, prefs, votes)
+        return self.take_options(self.iter_winner_options(candidate, prefs, votes))
+
+    def get_winning_ballots(self, candidate, prefs, votes):
+        """
+        Gets the witness ballot of the greedy engine that makes a specific candidate win
+
+        :param candidate: the candidate to get to 1st place
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :return: list with the new preferences of the witness, or an empty list if the candidate cannot win
+        """
+        option = self.engine.get_winning_option(self.engine.get_leeway(candidate, prefs, votes))
+        if option is None:
+            return []
+        return [self.get_preference_dict(candidate, option)]
+
+    def is_winner_possible(self, candidate, prefs, votes):
+        """
+        Checks if an agent can make a specific candidate win, without enumerating any option
+
+        :param candidate: the candidate to get to 1st place
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :return: True if there is at least one tactical voting option
+        """
+        return self.engine.can_win(candidate, prefs, votes)
+
+    def iter_winner_options(self, candidate, prefs, votes):
+        """
+        Lazily enumerates the new preferences that make a specific candidate win
+
+        :param candidate: the candidate to get to 1st place
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :return: a generator of new preference dicts for tactical voting
+        """
+        sorted_lee = self.engine.get_leeway(candidate, prefs, votes)
+
+        # check if tactical voting is possible
+        if self.engine.get_winning_option(sorted_lee) is None:
+            return
+
+        for option in self.iter_options(sorted_lee, self.scores[1:], True):
+            yield self.get_preference_dict(candidate, option)
+
+    def highest_position(self, candidate, prefs, votes, pref_pos):
+        """
+        Finds the highest position the candidate can be made to achieve with tactical voting,
+        which is proportional to the score of the "social index" happiness metric
+
+        :param candidate: the candidate to get to 1st place
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :param pref_pos: position of highest preference in voting
+        :return new_prefs: list of new preferences for tactical voting, within the budget
+        """
+        if self.opt_limit == 1:
+            return self.get_highest_position_ballots(candidate, prefs, votes, pref_pos)
+        return self.take_options(self.iter_highest_position_options(candidate, prefs, votes, pref_pos))
+
+    def get_highest_position_ballots(self, candidate, prefs, votes, pref_pos):
+        """
+        Gets the witness ballot of the greedy engine that gets the candidate to the highest position it can achieve
+
+        :param candidate: the candidate to get to 1st place
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :param pref_pos: position of highest preference in voting
+        :return: list with the new preferences of the witness, or an empty list if the position cannot be improved
+        """
+        sorted_lee = self.engine.get_leeway(candidate, prefs, votes)
+        if not (len(sorted_lee) - len(self.engine.get_losers(sorted_lee))) < pref_pos:
+            return []
+        return [self.get_preference_dict(candidate, self.engine.get_highest_position_option(sorted_lee))]
+
+    def iter_highest_position_options(self, candidate, prefs, votes, pref_pos):
+        """
+        Lazily enumerates the new preferences that get the candidate to the highest position it can achieve
+
+        :param candidate: the candidate to get to 1st place
+        :param prefs: preference dict of the agent changing their voting strategy
+        :param votes: tallied votes without our agents votes
+        :param pref_pos: position of highest preference in voting
+        :return: a generator of new preference dicts for tactical voting
+        """
+        sorted_lee = self.engine.get_leeway(candidate, prefs, votes)
+
+        max_losers = len(self.engine.get_losers(sorted_lee))
+        if not (len(sorted_lee) - max_losers) < pref_pos:
+            return
+
+        # the losers take the lowest scores, the other candidates are put on the start
+        for option in self.iter_options(sorted_lee, self.scores[len(self.scores) - max_losers:], False):
+            yield self.get_preference_dict(candidate, option)
+
+    def take_options(self, options):
+        """
+        Takes tactical options from a lazy enumeration until the count budget is spent
+
+        :param options: a generator of tactical voting options
+        :return: list of tactical voting options
+        """
+        if self.opt_limit is None:
+            return list(options)
+        return list(islice(options, self.opt_limit))
+
+    def get_preference_dict(self, candidate, option):
+        """
+        Builds the tallied preferences of a tactical option, with the candidate on top
+
+        :param candidate: the candidate put in 1st place
+        :param option: list of the other candidate-leeway pairs, from the second preference down
+        :return: preference dict of the tactical option
+        """
+        new_prefs = {candidate: self.scores[0]}
+        for y, score in zip(option, self.scores[1:]):
+            new_prefs[y[0]] = score
+        return new_prefs
+
+    def iter_options(self, sorted_leeway, slots, tight):
+        """
+        Depth-first tree expansion for populating the tactical options for both happiness metrics. The positions to
+        fill are expanded level by level, choosing which candidates take the scores of a level. The expansion is a
+        generator, backtracking over one shared preference list, so a leaf is only copied when it is yielded, and keeps
+        its own stack of levels, so it works for any number of candidates. The expansion stops once the time budget of this object is spent
+
+        :param sorted_leeway: a sorted list of candidate-leeway pairs in decreasing order of leeway
+        :param slots: the scores of the positions to fill, from the top down
+        :param tight: Boolean of whether or not all items in the sorted list are required to fit under their respective
+        threshold, set to true for "my preference" and false for "social index" happiness metrics
+        :return: a generator of new preference lists (candidate-leeway pairs) for tactical voting options
+        """
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.monotonic() + self.time_limit
+
+        levels = []
+        for score in slots:
+            if len(levels) > 0 and levels[-1][0] == score:
+                levels[-1][1] += 1
+            else:
+                levels.append([score, 1])
+
+        used = [False] * len(sorted_leeway)
+        current = []
+
+        def fits():
+            # the remaining candidates with the most leeway must be able to take the remaining scores, from the top
+            remaining_slots = slots[len(current):]
+            i = 0
+            for pair, is_used in zip(sorted_leeway, used):
+                if i == len(remaining_slots):
+                    break
+                if not is_used:
+                    if pair[1] < remaining_slots[i]:
+                        return False
+                    i += 1
+            return True
+
+        def get_leaf():
+            # put remainder on the start
+            if tight:
+                return list(current)
+            return [sorted_leeway[i] for i in range(len(sorted_leeway) - 1, -1, -1) if not used[i]] + current
+
+        def get_choices(level):
+            score, count = levels[level]
+            eligible = [i for i in range(len(sorted_leeway)) if not used[i] and sorted_leeway[i][1] >= score]
+            return combinations(eligible, count)
+
+        def expand():
+            if len(levels) == 0:
+                yield get_leaf()
+                return
+
+            # One frame per level being expanded: the choices left at that level, and the choice currently applied.
+            # The stack replaces recursion, so the depth is not bounded by the number of levels
+            stack = [[get_choices(0), ()]]
+            while len(stack) > 0:
+                if deadline is not None and time.monotonic() > deadline:
+                    return
+
+                frame = stack[-1]
+                for i in frame[1]:
+                    current.pop()
+                    used[i] = False
+
+                chosen = next(frame[0], None)
+                if chosen is None:
+                    stack.pop()
+                    continue
+
+                for i in chosen:
+                    used[i] = True
+                    current.append(sorted_leeway[i])
+                frame[1] = chosen
+
+                if fits():
+                    if len(stack) == len(levels):
+                        yield get_leaf()
+                    else:
+                        stack.append([get_choices(len(stack)), ()])
+
+        return expand()
@@ -0,0 +1,87 @@
+"""
+Checks of the enumeration of anonymous profiles used by the exact engine: every profile is enumerated once in any
+chunking, the voter orders of the profiles add up to all ordered profiles, and the probabilities of every culture add
+up to 1
+"""
+from itertools import combinations_with_replacement, product
+from math import factorial
+import numpy as np
+import pytest
+
+from simulation.anonymous_profiles import (count_anonymous_profiles, get_anonymous_profiles, get_log_voter_orders,
+                                           get_repeats)
+from simulation.cultures import ImpartialAnonymousCulture, ImpartialCulture, Mallows, SinglePeaked, Urn
+from voting.counted_profile import get_lehmer_codes
+
+# Small elections, as (voters, candidates), all profiles of which are enumerated
+CELLS = [(1, 3), (2, 2), (3, 3), (4, 3), (2, 4), (3, 4)]
+
+CULTURES = [ImpartialCulture(), Mallows(0.5), Mallows(0.2, reference=[2, 0, 1]), SinglePeaked(), Urn(0.3),
+            ImpartialAnonymousCulture()]
+
+
+@pytest.mark.parametrize("n_voters, n_candidates", CELLS)
+def test_chunks_enumerate_every_profile_once(n_voters, n_candidates):
+    expected = list(combinations_with_replacement(range(factorial(n_candidates)), n_voters))
+    n_profiles = count_anonymous_profiles(n_voters, n_candidates)
+    assert n_profiles == len(expected)
+
+    for chunk_size in (1, 7, n_profiles):
+        chunks = [get_anonymous_profiles(n_voters, n_candidates, start, start + chunk_size)
+                  for start in range(0, n_profiles, chunk_size)]
+
+        codes = np.concatenate([codes for _, codes in chunks])
+        assert [tuple(profile_codes) for profile_codes in codes.tolist()] == expected
+
+        # The rankings of every profile are the rankings of its codes
+        profiles = np.concatenate([profiles for profiles, _ in chunks])
+        np.testing.assert_array_equal(get_lehmer_codes(profiles), codes)
+
+    profiles, codes = get_anonymous_profiles(n_voters, n_candidates, n_profiles, n_profiles + 1)
+    assert profiles.shape == (0, n_voters, n_candidates) and codes.shape == (0, n_voters)
+
+
+@pytest.mark.parametrize("n_voters, n_candidates", CELLS)
+def test_voter_orders_count_every_ordered_profile(n_voters, n_candidates):
+    _, codes = get_anonymous_profiles(n_voters, n_candidates, 0, count_anonymous_profiles(n_voters, n_candidates))
+    voter_orders = np.exp(get_log_voter_orders(get_repeats(codes)))
+
+    assert np.isclose(voter_orders.sum(), factorial(n_candidates) ** n_voters)
+
+    # Every ordered profile sorts to exactly one anonymous profile
+    counts = {}
+    for ordered_codes in product(range(factorial(n_candidates)), repeat=n_voters):
+        key = tuple(sorted(ordered_codes))
+        counts[key] = counts.get(key, 0) + 1
+
+    np.testing.assert_allclose(voter_orders, [counts[tuple(profile_codes)] for profile_codes in codes.tolist()])
+
+
+@pytest.mark.parametrize("n_voters, n_candidates", CELLS)
+@pytest.mark.parametrize("culture", CULTURES, ids=repr)
+def test_profile_probabilities_sum_to_one(culture, n_voters, n_candidates):
+    if isinstance(culture, Mallows) and culture.reference is not None and len(culture.reference) != n_candidates:
+        pytest.skip("The reference ranking is for another number of candidates")
+
+    _, codes = get_anonymous_profiles(n_voters, n_candidates, 0, count_anonymous_profiles(n_voters, n_candidates))
+    probabilities = culture.get_profile_probabilities(codes, n_candidates)
+
+    assert np.all(probabilities >= 0)
+    assert np.isclose(probabilities.sum(), 1)
+
+
+@pytest.mark.parametrize("culture", CULTURES, ids=repr)
+def test_profile_probabilities_match_samples(culture):
+    n_voters, n_candidates, n_samples = 3, 3, 40000
+
+    _, codes = get_anonymous_profiles(n_voters, n_candidates, 0, count_anonymous_profiles(n_voters, n_candidates))
+    probabilities = culture.get_profile_probabilities(codes, n_candidates)
+
+    samples = culture.sample(np.random.default_rng(0), n_samples, n_voters, n_candidates)
+    sampled_codes = np.sort(get_lehmer_codes(samples), axis=1)
+    indices = {tuple(profile_codes): i for i, profile_codes in enumerate(codes.tolist())}
+    frequencies = np.bincount([indices[tuple(profile_codes)] for profile_codes in sampled_codes.tolist()],
+                              minlength=len(codes)) / n_samples
+
+    # About six standard deviations of the frequency of a profile
+    np.testing.assert_allclose(frequencies, probabilities, atol=6 * np.sqrt(0.25 / n_samples))
@@ -0,0 +1,91 @@
+"""
+Checks of the sweep scheduler: however the jobs are chunked, and whether or not jobs are added while it runs, every
+task is run exactly once and the outputs of every job come back in task order
+"""
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+
+from simulation.scheduler import CostModel, SweepScheduler
+
+
+def run_task(task):
+    """
+    :param task: A tuple (job_id, index) of a task
+    :return: Returns the outputs of the task, the task itself
+    """
+    return [task]
+
+
+def get_jobs(rng, n_jobs):
+    """
+    :param rng: A numpy random Generator
+    :param n_jobs: An integer for the number of jobs
+    :return: Returns a list of jobs of very different costs, with tasks of random sizes
+    """
+    jobs = []
+    for job_id in range(n_jobs):
+        n_tasks = int(rng.integers(1, 60))
+        key = (["election", "batch"][job_id % 2], "Borda", bool(job_id % 3 == 0))
+        jobs.append((job_id, (key, int(rng.integers(3, 10)), int(rng.integers(2, 50))),
+                     [(job_id, i) for i in range(n_tasks)], rng.integers(1, 20, size=n_tasks).tolist()))
+
+    return jobs
+
+
+def test_chunks_cover_every_task_once():
+    scheduler = SweepScheduler(CostModel(), workers=4)
+    jobs = get_jobs(np.random.default_rng(0), 12)
+    for job in jobs:
+        scheduler.add(job)
+
+    covered = {job[0]: [] for job in jobs}
+    while (chunk := scheduler.get_next_chunk()) is not None:
+        job_id, _, start, end = chunk
+        assert start < end
+        covered[job_id].append((start, end))
+
+    # The chunks of every job are consecutive ranges, from its first task to its last
+    for job_id, _, tasks, _ in jobs:
+        bounds = [start for start, _ in covered[job_id]] + [len(tasks)]
+        assert bounds[0] == 0 and [end for _, end in covered[job_id]] == bounds[1:]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_every_task_runs_once_in_order(workers):
+    rng = np.random.default_rng(workers)
+    executor = None if workers == 1 else ThreadPoolExecutor(max_workers=workers)
+    scheduler = SweepScheduler(CostModel(), executor, workers)
+
+    jobs = get_jobs(rng, 10)
+    for job in jobs[:6]:
+        scheduler.add(job)
+
+    # The other jobs are added while the scheduler runs, as the next rounds of adaptive cells are
+    finished = {}
+    try:
+        for job_id, outputs in scheduler.run(run_task):
+            assert job_id not in finished
+            finished[job_id] = outputs
+            if len(finished) <= len(jobs) - 6:
+                scheduler.add(jobs[5 + len(finished)])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    assert finished == {job_id: tasks for job_id, _, tasks, _ in jobs}
+    assert scheduler.jobs == {}
+
+
+def test_cost_model_persists_its_timings(tmp_path):
+    key = ("election", "Borda", True)
+    cost_model = CostModel()
+    for n_candidates, n_voters in [(3, 5), (5, 10), (8, 40)]:
+        cost_model.observe(key, n_candidates, n_voters, 10, 1e-4 * n_candidates ** 1.5 * n_voters ** 1.5)
+
+    path = str(tmp_path / "costs.json")
+    cost_model.save(path)
+    loaded = CostModel.load(path)
+
+    assert loaded.predict(key, 6, 20, 3) == cost_model.predict(key, 6, 20, 3)
+    assert CostModel.load(str(tmp_path / "missing.json")).observations == {}
@@ -0,0 +1,91 @@
+"""
+Checks of the streaming statistics of the sweeps: a stream fed in rounds gives the mean and variance numpy computes
+over all its values at once, and the intervals are the normal ones
+"""
+import numpy as np
+import pytest
+
+import tva
+from simulation.results_store import METRIC_COLUMNS
+from simulation.streaming_statistics import StreamingStatistics, get_z_score
+
+
+def add_in_rounds(values, weights, rng):
+    """
+    Adds values to fresh statistics, in rounds of random sizes
+
+    :param values: A numpy array of values
+    :param weights: A numpy array with the weight of every value
+    :param rng: A numpy random Generator
+    :return: Returns a StreamingStatistics object
+    """
+    statistics = StreamingStatistics()
+
+    bounds = np.sort(rng.choice(np.arange(1, len(values)), size=5, replace=False))
+    for round_values, round_weights in zip(np.split(values, bounds), np.split(weights, bounds)):
+        for value, weight in zip(round_values, round_weights):
+            statistics.add(value, weight)
+
+    return statistics
+
+
+@pytest.mark.parametrize("offset", [0, 1e9])
+def test_split_stream_matches_numpy(offset):
+    rng = np.random.default_rng(1)
+    values = offset + rng.normal(size=500)
+
+    statistics = add_in_rounds(values, np.ones(len(values), dtype=np.int64), rng)
+
+    # A large offset cancels catastrophically in a sum of squares, but not in the updates of the mean
+    assert statistics.count == len(values)
+    assert np.isclose(statistics.get_mean(), np.mean(values), rtol=1e-12)
+    assert np.isclose(statistics.get_variance(), np.var(values, ddof=1), rtol=1e-6)
+
+
+def test_weighted_split_stream_matches_numpy():
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=500)
+    weights = rng.random(500)
+
+    statistics = add_in_rounds(values, weights, rng)
+
+    mean = np.average(values, weights=weights)
+    assert np.isclose(statistics.get_mean(), mean)
+    assert np.isclose(statistics.squared_deviations, np.sum(weights * (values - mean) ** 2))
+
+
+def test_half_width_is_normal_interval():
+    values = np.random.default_rng(3).normal(size=100)
+    statistics = StreamingStatistics()
+    for value in values:
+        statistics.add(value)
+
+    z_score = get_z_score(0.95)
+    assert np.isclose(z_score, 1.959963984540054)
+    assert np.isclose(statistics.get_half_width(z_score), z_score * np.std(values, ddof=1) / np.sqrt(len(values)))
+
+    single = StreamingStatistics()
+    single.add(1.0)
+    assert np.isnan(single.get_half_width(z_score)) and np.isnan(StreamingStatistics().get_mean())
+
+    with pytest.raises(Exception):
+        get_z_score(1)
+
+
+def test_cell_accumulated_in_rounds_matches_numpy():
+    rng = np.random.default_rng(4)
+    outputs = [tva.create_and_run_election(5, 4, "Borda", False, rng) for _ in range(40)]
+
+    statistics = None
+    for start in range(0, len(outputs), 15):
+        statistics = tva.accumulate_cell(outputs[start:start + 15], statistics=statistics)
+
+    metrics = [tva.get_election_metrics(output) for output in outputs]
+    for column in METRIC_COLUMNS:
+        values = [election_metrics[column] for election_metrics in metrics if election_metrics[column] is not None]
+        if not values:
+            assert np.isnan(statistics[column].get_mean())
+            continue
+
+        assert np.isclose(statistics[column].get_mean(), np.mean(values))
+        assert np.isclose(statistics[column].get_variance(), np.var(values, ddof=1))
@@ -0,0 +1,74 @@
+"""
+Checks of the sweep cache: finished cells are stored and read back unchanged, cells are told apart by everything
+their results depend on, and a sweep found in the cache is not run again
+"""
+import numpy as np
+
+import tva
+from simulation.cultures import ImpartialCulture, Mallows
+from simulation.results_store import read_results
+from simulation.sweep_cache import SweepCache
+
+
+def get_key(**changes):
+    """
+    :param changes: The arguments of SweepCache.get_key to change
+    :return: Returns the key of a sweep cell, with the given arguments changed
+    """
+    arguments = {"voting_scheme": "Borda", "n_candidates": 3, "n_voters": 4, "tests": 20, "seed": 1,
+                 "is_advanced": False, "engine": "election", "engine_version": tva.SWEEP_ENGINE_VERSION,
+                 "culture": repr(ImpartialCulture()), "stopping": [{}, tva.CONFIDENCE]}
+    arguments.update(changes)
+
+    return SweepCache.get_key(**arguments)
+
+
+def test_cell_round_trips(tmp_path):
+    rng = np.random.default_rng(0)
+    outputs = [tva.create_and_run_election(4, 3, "Borda", False, rng) for _ in range(10)]
+    row = tva.get_cell_row("Borda", 3, 4, len(outputs), tva.accumulate_cell(outputs))
+
+    cache = SweepCache(str(tmp_path / "cache"))
+    key = get_key()
+    assert cache.get(key) is None
+
+    cache.put(key, row)
+    cached = cache.get(key)
+
+    # Counter voting is not run by the basic TVA, so its means and half-widths are NaN
+    assert cached.keys() == row.keys()
+    for column, value in row.items():
+        if isinstance(value, str):
+            assert cached[column] == value
+        else:
+            np.testing.assert_equal(cached[column], value)
+
+
+def test_keys_tell_cells_apart():
+    assert get_key() == get_key()
+
+    for changes in [{"n_voters": 5}, {"seed": 2}, {"engine_version": tva.SWEEP_ENGINE_VERSION + 1},
+                    {"culture": repr(Mallows(0.5))}, {"stopping": [{"average_tactical_voting_risk_H_p": 0.01}, 0.95]},
+                    {"stopping": [{}, 0.99]}]:
+        assert get_key(**changes) != get_key()
+
+
+def test_sweep_resumes_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(tva, "N_CANDIDATES_TEST", [3])
+    monkeypatch.setattr(tva, "N_VOTERS_TEST", [2, 3])
+    data_folder = str(tmp_path) + "/"
+
+    tva.run_tests(data_folder, 20, "Plurality", False, seed=1)
+    results = read_results(data_folder + "results_Plurality.npz")
+
+    def run_sweep_task(task):
+        raise AssertionError("A cell found in the cache was run again")
+
+    monkeypatch.setattr(tva, "run_sweep_task", run_sweep_task)
+
+    tva.run_tests(data_folder, 20, "Plurality", False, seed=1)
+    cached_results = read_results(data_folder + "results_Plurality.npz")
+
+    assert results.keys() == cached_results.keys()
+    for column in results:
+        np.testing.assert_array_equal(cached_results[column], results[column])
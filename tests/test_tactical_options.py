@@ -0,0 +1,189 @@
+"""
+Brute-force checks of the tactical voting searches: for every ballot count of 2 to 5 candidates, every ballot an agent
+can cast is tried, and the fast searches must find exactly what the enumeration finds
+"""
+from itertools import permutations
+import numpy as np
+import pytest
+
+from agents.agent import get_winner
+from simulation.batch_engine import BatchElections
+from strategies.greedy_scoring import GreedyScoring
+from strategies.strategies_scoring import Strategies_scoring
+from tva import TVA, get_basic_tactical_summary
+from voting.voting_schemes import (AntiPlurality, Borda, Dowdall, KApproval, Plurality, TruncatedBorda,
+                                   VotingForTwo)
+
+SCORING_RULES = [Borda, TruncatedBorda, Dowdall, KApproval, Plurality, VotingForTwo, AntiPlurality]
+
+# Scoring rules giving scores of 1 and 0 only, which have a closed form for the tactical summary of a batch
+APPROVAL_RULES = [KApproval, Plurality, VotingForTwo, AntiPlurality]
+
+CANDIDATE_COUNTS = [2, 3, 4, 5]
+
+# Number of random tallies every check is run on, per scoring rule and number of candidates
+N_TALLIES = 25
+
+# Numbers of voters of the random elections every check is run on, and number of elections per number of voters
+VOTER_COUNTS = [2, 3, 4, 7]
+N_ELECTIONS = 5
+
+# Number of elections of the batches the closed form is checked on, per number of voters
+BATCH_SIZE = 25
+
+
+def get_random_tally(scores, rng):
+    """
+    :param scores: A numpy array of the scores of every position of a ballot
+    :param rng: A numpy random Generator
+    :return: Returns a dictionary of the votes of a few random ballots, with the candidates in the order of their ids
+    """
+    m = len(scores)
+    votes = np.zeros(m, dtype=np.int64)
+    for _ in range(rng.integers(1, 6)):
+        votes[rng.permutation(m)] += scores
+
+    return {candidate: int(votes[candidate]) for candidate in range(m)}
+
+
+def get_rank(votes, candidate):
+    """
+    :param votes: A dictionary of tallied votes, with the candidates in the order of their ids
+    :param candidate: A candidate id
+    :return: Returns the index of the candidate in the results, where ties go to the lowest id
+    """
+    return sum(votes[x] > votes[candidate] or (votes[x] == votes[candidate] and x < candidate) for x in votes)
+
+
+def get_outcomes(votes, scores):
+    """
+    Casts every ballot on top of a tally
+
+    :param votes: A dictionary of tallied votes, with the candidates in the order of their ids
+    :param scores: A numpy array of the scores of every position of a ballot
+    :return: Returns a dictionary mapping every ballot, a tuple of candidates in preference order, to its tally
+    """
+    outcomes = {}
+    for ballot in permutations(votes):
+        outcome = dict(votes)
+        for candidate, score in zip(ballot, scores):
+            outcome[candidate] += int(score)
+        outcomes[ballot] = outcome
+
+    return outcomes
+
+
+def get_assignment(ballot, scores):
+    """
+    :param ballot: An iterable of candidates in preference order
+    :param scores: An iterable of the scores of every position of a ballot
+    :return: Returns the scores the ballot gives, as a sorted tuple of candidate-score pairs
+    """
+    return tuple(sorted((candidate, int(score)) for candidate, score in zip(ballot, scores)))
+
+
+@pytest.mark.parametrize("n_candidates", CANDIDATE_COUNTS)
+@pytest.mark.parametrize("scheme", SCORING_RULES, ids=lambda scheme: scheme.__name__)
+def test_greedy_engine_matches_every_ballot(scheme, n_candidates):
+    scores = scheme.get_score_vector(n_candidates)
+    engine = GreedyScoring(scores)
+    strategy = Strategies_scoring(scores, None)
+    rng = np.random.default_rng(n_candidates)
+
+    for _ in range(N_TALLIES):
+        votes = get_random_tally(scores, rng)
+        prefs = dict.fromkeys(rng.permutation(n_candidates).tolist(), 0)
+        outcomes = get_outcomes(votes, scores)
+
+        for candidate in votes:
+            winning = {get_assignment(ballot, scores) for ballot, outcome in outcomes.items()
+                       if ballot[0] == candidate and get_winner(outcome) == candidate}
+            assert engine.can_win(candidate, prefs, votes) == bool(winning)
+
+            options = [tuple(sorted(option.items()))
+                       for option in strategy.iter_winner_options(candidate, prefs, votes)]
+            assert len(options) == len(set(options))
+            assert set(options) == winning
+
+            ranks = {ballot: get_rank(outcome, candidate) for ballot, outcome in outcomes.items()}
+            best_rank = min(ranks.values())
+            assert engine.get_highest_position(candidate, prefs, votes) == best_rank
+
+            best = {get_assignment(ballot, scores) for ballot, rank in ranks.items() if rank == best_rank}
+            options = [tuple(sorted(option.items()))
+                       for option in strategy.iter_highest_position_options(candidate, prefs, votes, n_candidates)]
+            assert set(options) <= best
+            assert bool(options) == (best_rank < n_candidates)
+
+
+@pytest.mark.parametrize("n_candidates", CANDIDATE_COUNTS)
+@pytest.mark.parametrize("scheme", SCORING_RULES, ids=lambda scheme: scheme.__name__)
+def test_tactical_options_reach_the_best_ballot(scheme, n_candidates):
+    rng = np.random.default_rng(n_candidates)
+
+    for n_voters in VOTER_COUNTS * N_ELECTIONS:
+        election = TVA(n_candidates, scheme.__name__, n_voters, False, rng=rng)
+        election.run()
+
+        for agent in election.get_agents():
+            options = scheme().tactical_options(agent, election)
+            delta_tally = scheme().get_delta_tally(agent, election)
+            happiness = agent.get_happiness(election.results)
+
+            outcomes = [agent.get_happiness(delta_tally.get_results(list(ballot)))
+                        for ballot in permutations(agent.get_preferences())]
+
+            for key in options:
+                # Only a ballot which makes the agent happier is a tactical option, and every option is a best one
+                best = max(outcome[key] for outcome in outcomes)
+                expected = {best} if best > happiness[key] else set()
+                assert {option[3][key] for option in options[key].values()} == expected
+
+
+def get_searched_summary(election):
+    """
+    Builds the tactical summary of an election from the options of the exact search
+
+    :param election: A TVA object, which has been run
+    :return: Returns a dictionary with, for every type of happiness, a tuple (has_option, best_happiness) of numpy
+    arrays indexed by agent
+    """
+    agents = election.get_agents()
+    summary = {key: (np.zeros(len(agents), dtype=bool), np.zeros(len(agents))) for key in ("H_p", "H_si")}
+
+    for i, agent in enumerate(agents):
+        options = election.scheme().tactical_options(agent, election)
+        for key, (has_option, best_happiness) in summary.items():
+            if options[key]:
+                has_option[i] = True
+                best_happiness[i] = max(option[3][key] for option in options[key].values())
+
+    return summary
+
+
+@pytest.mark.parametrize("n_candidates", CANDIDATE_COUNTS)
+@pytest.mark.parametrize("scheme", APPROVAL_RULES, ids=lambda scheme: scheme.__name__)
+def test_batch_tactical_summary_matches_the_search(scheme, n_candidates):
+    for n_voters in VOTER_COUNTS:
+        batch = BatchElections.generate(BATCH_SIZE, n_voters, n_candidates, scheme,
+                                        np.random.default_rng(n_candidates * 100 + n_voters))
+        batch_summary = scheme().get_batch_tactical_summary(batch.profiles, batch.positions, batch.totals)
+
+        for e, profile in enumerate(batch.profiles):
+            election = TVA(n_candidates, scheme.__name__, n_voters, False, profile=profile)
+            election.run()
+
+            expected = get_searched_summary(election)
+            election_summary = get_basic_tactical_summary(election)
+
+            for key, (has_option, best_happiness) in expected.items():
+                for summary in (batch_summary[key][0][e], batch_summary[key][1][e]), election_summary[key]:
+                    assert np.array_equal(summary[0], has_option)
+                    assert np.allclose(summary[1], best_happiness)
+
+
+@pytest.mark.parametrize("scheme", [Borda, TruncatedBorda, Dowdall], ids=lambda scheme: scheme.__name__)
+def test_batch_tactical_summary_needs_approval_scores(scheme):
+    batch = BatchElections.generate(BATCH_SIZE, 3, 4, scheme, np.random.default_rng(0))
+
+    assert scheme().get_batch_tactical_summary(batch.profiles, batch.positions, batch.totals) is None
@@ -6,12 +6,73 @@ The Tactical Voter Analyst (TVA) for the course: Multi-Agent Systems
 """
 
 import importlib
+import io
 import os.path
-import random
+import sys
 import numpy as np
-from copy import copy
+from concurrent.futures import ProcessPoolExecutor
 
-from agents.agent import Agent, get_winner
+from agents.agent import Agent
+from agents.happiness import get_position_matrix
+from analysis.election_analysis import ElectionAnalysis
+from reports.election_report import REPORT_FULL, TextSink, write_report
+from simulation.anonymous_profiles import count_anonymous_profiles, get_anonymous_profiles
+from simulation.batch_engine import BatchElections
+from simulation.cultures import ImpartialCulture
+from simulation.scheduler import CostModel, SweepScheduler
+from simulation.results_store import HAPPINESS_TYPES, METRIC_COLUMNS, METRICS, write_results
+from simulation.streaming_statistics import StreamingStatistics, get_z_score
+from simulation.sweep_cache import SweepCache
+from voting.counted_profile import CountedProfile
+
+# Number of elections generated and evaluated together by the batch engine
+BATCH_SIZE = 1000
+
+# Version of the sweep engines, part of the key of every cached sweep cell. Bump it whenever a change to the TVA
+# changes the results of a sweep, so that cached cells are recomputed
+SWEEP_ENGINE_VERSION = 5
+
+# Confidence level of the intervals stored next to the metrics of a sweep
+CONFIDENCE = 0.95
+
+# Number of elections an adaptive cell runs before its intervals are trusted to decide whether it is finished
+MIN_ADAPTIVE_TESTS = 30
+
+
+def get_voting_scheme(voting_scheme):
+    """
+    Imports the voting scheme class with the given name from voting_schemes.py
+
+    :param voting_scheme: A string indicating the type of voting
+    :return: Returns the voting scheme class - raises an exception if it has not been implemented
+    """
+    module = importlib.import_module("voting.voting_schemes")
+
+    # Check if module has the voting scheme
+    if not hasattr(module, voting_scheme):
+        raise Exception(f"{voting_scheme} has not been implemented")
+
+    return getattr(module, voting_scheme)
+
+
+def get_candidate_labels(candidates):
+    """
+    Creates the label table of the candidates of an election. Candidates are identified by their integer ids
+    everywhere, and the labels are only used to name them in results, preferences and reports
+
+    :param candidates: A string of candidate letters (for example "ABCDEFG"), a sequence of labels, or an integer for
+    the number of candidates, which are then labelled by their ids
+    :return: Returns a tuple, where index i holds the label of candidate i - raises an exception if a label is repeated
+    """
+    if isinstance(candidates, int):
+        return tuple(range(candidates))
+
+    labels = tuple(candidates)
+
+    if len(set(labels)) != len(labels):
+        raise Exception("Every candidate needs a distinct label")
+
+    return labels
 
 
 class TVA:
@@ -19,32 +80,38 @@ class TVA:
     Tactical Voting Analyst class
     """
 
-    def __init__(self, candidate_string, voting_scheme, num_agents, advanced_tva):
+    def __init__(self, candidate_labels, voting_scheme, num_agents, advanced_tva, rng=None, profile=None,
+                 culture=None):
         """
         The constructor for the TVA
 
-        When initialised, this constructor creates a dictionary of the candidates from the candidate string.
+        When initialised, this constructor creates a dictionary of the candidates from their labels.
         The class then imports the respective voting scheme - raises an exception if not found in voting_schemes.py
-        It also creates the specified number of agents
+        It also creates the ballot matrix of the specified number of agents, and the agents viewing its rows
 
-        :param candidate_string: A string of candidates, for example: "ABCDEFG"
+        :param candidate_labels: A string of candidates, for example: "ABCDEFG", a sequence of candidate labels, or an
+        integer for the number of candidates, which are then labelled by their ids
         :param voting_scheme: A string indicating the type of voting
         :param num_agents: An integer for the number of agents in the election
+        :param advanced_tva: A boolean, True if the advanced TVA features should be shown
+        :param rng: A numpy random Generator used to generate the preferences, defaults to a freshly seeded one
+        :param profile: A ballot matrix (voters x positions) to use instead of generating random preferences
+        :param culture: A Culture object the preferences are drawn from, defaults to impartial culture
         """
 
-        self.candidate_string = candidate_string
+        self.labels = get_candidate_labels(candidate_labels)
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.culture = ImpartialCulture() if culture is None else culture
         self.candidates = self.create_candidates()
         self.num_agents = num_agents
         self.voting_scheme = voting_scheme
         self.is_atva = advanced_tva
 
-        module = importlib.import_module("voting.voting_schemes")
+        self.scheme = get_voting_scheme(voting_scheme)
 
-        # Check if module has the voting scheme
-        if not hasattr(module, voting_scheme):
-            raise Exception(f"{voting_scheme} has not been implemented")
-
-        self.scheme = getattr(module, voting_scheme)
+        self.profile = self.create_profile(num_agents) if profile is None else profile
+        self.positions = get_position_matrix(self.profile)
+        self.counted_profile = CountedProfile.from_profile(self.profile)
 
         self.agents = self.create_agents(num_agents)
 
@@ -58,7 +125,7 @@ class TVA:
 
         :return: void
         """
-        self.results = self.scheme().run_scheme(self.candidates, self.agents)
+        self.results = self.scheme().tally_counted_profile(self.candidates, self.counted_profile)
 
     def get_agents(self):
         """
@@ -66,9 +133,19 @@ class TVA:
         """
         return self.agents
 
+    def create_profile(self, num_agents):
+        """
+        Creates the ballot matrix of the election, drawing the rankings of all agents at once from the culture. Each
+        row is the ballot of an agent, holding candidate ids in preference order
+
+        :param num_agents: An integer indicating the number of agents to create
+        :return: Returns a numpy matrix (voters x positions) of a small unsigned integer type
+        """
+        return self.culture.sample_profile(self.rng, num_agents, len(self.labels))
+
     def create_agents(self, num_agents):
         """
-        Creates a specified number of agents
+        Creates a specified number of agents, each a view over its row of the ballot matrix
 
         :param num_agents: An integer indicating the number of agents to create
         :return: Returns a list of agent objects
@@ -76,30 +153,22 @@ class TVA:
         agents = []
 
         for i in range(num_agents):
-            agents.append(Agent(f"Agent{i + 1}", self.generate_preferences(), self.scheme))
+            agents.append(Agent(f"Agent{i + 1}", self.profile[i], self.labels, self.scheme))
 
         return agents
 
-    def generate_preferences(self):
-        """
-        Generates a randomly shuffled string from the candidate string. This is used to generate random
-        agent preferences
-
-        :return: Returns a randomly shuffled string
-        """
-        return "".join(random.sample(self.candidate_string, len(self.candidate_string)))
-
     def create_candidates(self):
         """
-        Creates a dictionary of the candidates in the election. It initially sets all votes to 0
+        Creates a dictionary of the candidates in the election, keyed by their labels in the order of their ids. It
+        initially sets all votes to 0
 
         :return: Returns a dictionary of the candidates, will all their votes set to 0
         """
 
         candidate_dict = {}
 
-        for letter in self.candidate_string:
-            candidate_dict[letter] = 0
+        for label in self.labels:
+            candidate_dict[label] = 0
 
         return candidate_dict
 
@@ -111,240 +180,130 @@ class TVA:
         :return: Returns a nested list (or matrix) representing all preferences of all agents
         """
 
-        matrix = []
+        names = np.array([agent.name for agent in self.agents])
+        labels = np.array(self.labels)
 
-        for agent in self.agents:
+        return np.vstack([names, labels[self.profile].transpose()])
 
-            row = [agent.name]
+    def get_totals(self, results):
+        """
+        Converts a dictionary of results into a vector of tallied votes
 
-            for candidate in agent.get_preferences():
-                row.append(f"{candidate}")
+        :param results: A dictionary of results
+        :return: Returns a numpy array of tallied votes, indexed by candidate
+        """
+        return np.array([results[candidate] for candidate in self.candidates], dtype=np.int64)
 
-            matrix.append(row)
+    def get_cast_ballot(self, agent):
+        """
+        :param agent: An agent object of the election
+        :return: Returns the ballot the agent cast, as a tuple of candidate indices
+        """
+        return tuple(agent.ballot.tolist())
 
-        np_matrix = np.array(matrix)
+    def get_all_happiness(self, results):
+        """
+        Computes the happiness of every agent for the given results, in one vectorized pass over the distinct rankings
 
-        return np_matrix.transpose()
+        :param results: A dictionary of results
+        :return: Returns a dictionary of numpy arrays, holding each agent's happiness for every type of happiness
+        """
+        return self.counted_profile.get_all_happiness(self.get_totals(results))
 
     def get_overall_happiness(self):
+        """
+        Computes the average happiness of all agents for the current results
 
-        for a in self.agents:
-            happiness = a.get_happiness(self.results)
-
-            for happiness_computation in happiness:
-                if happiness_computation not in self.happinesses:
-                    self.happinesses[happiness_computation] = []
-                self.happinesses[happiness_computation].append(happiness[happiness_computation])
-
-        overall_happiness = {}
-
-        for happiness_computation in self.happinesses:
-            overall_happiness[happiness_computation] = sum(self.happinesses[happiness_computation]) / len(
-                self.happinesses[happiness_computation])
+        :return: Returns a dictionary with the overall happiness for every type of happiness
+        """
+        self.happinesses = self.get_all_happiness(self.results)
 
-        return overall_happiness
+        return self.counted_profile.get_overall_happiness(self.get_totals(self.results))
 
-    def get_report(self):
+    def get_report(self, verbosity=REPORT_FULL, limit=None):
         """
         Creates a report of the entire election, and highlights the most important information
+
+        :param verbosity: The verbosity level of the report, see reports.election_report.iter_report
+        :param limit: The maximum number of agents (and of options per agent) to report, or None for all of them
         :return: Returns a string reporting the important info of the election
         """
+        stream = io.StringIO()
+        self.write_report(TextSink(stream), verbosity, limit)
 
-        string = ""
-
-        preference_happiness_count = 0
-        social_index_count = 0
-
-        string += "##### ELECTION RESULTS #####\n\n"
-        string += f"Voting scheme: {self.voting_scheme}\n"
-
-        agent_string = ""
-        for a in self.agents:
-            agent_string += str(a) + " "
-
-        string += f"The voters: {agent_string}\n"
-
-        string += f"The voters preferences are summarised below\n"
-        string += str(self.get_preference_matrix()) + "\n"
-
-        string += f"Here are all the results\n"
-        string += str(self.results) + "\n"
-        string += f"The winner of this election is: {get_winner(self.results)}\n"
-
-        string += "The happiness of all agents are:\n"
-
-        for a in self.agents:
-            happiness = a.get_happiness(self.results)
-            string += f"{a.name} : {happiness} %\n"
+        return stream.getvalue()
 
-        overall_happiness = self.get_overall_happiness()
-
-        string += f"The overall happiness is: {overall_happiness}\n\n"
-
-        string += "##### TACTICAL VOTING #####\n\n"
-
-        happiness_threshold = 99
-
-        # Check how agents would change their votes depending on happiness
-        for a in self.agents:
-
-            happiness_dict = a.get_happiness(self.results)
-
-            string += f"For {str(a)} with initial happiness: {happiness_dict}\n"
-
-            if happiness_dict["H_si"] > happiness_threshold and happiness_dict["H_p"] > happiness_threshold:
-
-                string += f"{str(a)} was happy and didn't change their preferences\n\n"
-
-            else:
-                tact_dictionary = self.scheme().tactical_options(a, copy(self))
-
-                string += f"For {str(a)}, the tactical options are:\n"
-
-                for key in tact_dictionary:
-
-                    if len(tact_dictionary[key]) < 1:
-                        string += f"{str(a)} was unhappy ({key}), but did not have any tactical voting strategy\n\n"
-                        continue
-
-                    if key == "H_p":
-                        preference_happiness_count += 1
-
-                    if key == "H_si":
-                        social_index_count += 1
-
-                    for option in tact_dictionary[key]:
-                        string += f"Type of happiness: {key} \n" \
-                                  f"Option:{option} new preferences: {tact_dictionary[key][option][0]} , " \
-                                  f"new winner: {tact_dictionary[key][option][1]}, " \
-                                  f"new voting outcome: {tact_dictionary[key][option][2]}, " \
-                                  f"new {key}: {tact_dictionary[key][option][3][key]}, " \
-                                  f"new overall {key}: {tact_dictionary[key][option][4][key]}\n"
-
-            string += "------------------------\n"
-
-        string += f"Risk based on H_p: {(preference_happiness_count / len(self.agents))*100}%\n"
-        string += f"Risk based on H_si: {(social_index_count / len(self.agents))*100}%\n\n"
-
-        if self.is_atva:
-
-            string += f"##### ADVANCED TVA: Counter voting strategies #####\n\n"
-
-            for a in self.agents:
-
-                counter_voting_set = self.scheme().counter_vote(a, copy(self))
-
-                string += f"For {str(a)} \n"
-
-                # element is a list = [other_agent, their prefs (list), new results (list),
-                # tactical options of agent after the other agents prefs (dict)]
-                for happiness_type in counter_voting_set:
-                    string += f"\tConsidering {happiness_type}:\n\n"
-
-                    for sublist in counter_voting_set[happiness_type]:
-
-                        other_agent = sublist[0]
-                        other_prefs = sublist[1]
-                        new_results = sublist[2]
-                        new_tact_options = sublist[3]
-
-                        if other_prefs is None:
-                            string += f"\t{other_agent} didn't have any tactical voting strategies, so {a} isn't affected\n"
-                            string += "--------------------------\n"
-                            continue
+    def write_report(self, sink, verbosity=REPORT_FULL, limit=None, analysis=None):
+        """
+        Streams the report of the election to a sink, record by record, without building it in memory first
 
-                        string += f"\tFor the type of happiness: {happiness_type}\n"
-                        string += f"\tIf {str(other_agent)} decides to go with new preferences: {other_prefs}\n"
-                        string += f"\tThe new results would be: {new_results}\n"
+        :param sink: A sink object with a write(record) method, such as TextSink or JsonLinesSink
+        :param verbosity: The verbosity level of the report, see reports.election_report.iter_report
+        :param limit: The maximum number of agents (and of options per agent) to report, or None for all of them
+        :param analysis: The ElectionAnalysis of the election, to reuse its results. Created when not given
+        :return: void
+        """
+        write_report(self, sink, verbosity, limit, analysis)
 
-                        if len(new_tact_options) < 1:
-                            string += f"\tBut {str(a)} would not have any tactical options for this counter\n"
-                            string += "--------------------------\n"
-                            continue
 
-                        string += f"\tTherefore, {str(a)} has these tactical options:\n"
+def get_basic_tactical_summary(election):
+    """
+    Runs the basic TVA for every agent of an election, only keeping whether an agent has a tactical option and the
+    best happiness they can reach with it
 
-                        for option in new_tact_options:
-                            string += f"\tType of happiness {happiness_type}: Option:{option} new preferences: {new_tact_options[option][0]} , " \
-                                      f"new winner: {new_tact_options[option][1]}, " \
-                                      f"new voting outcome: {new_tact_options[option][2]}, " \
-                                     f"new {happiness_type}: {new_tact_options[option][3][happiness_type]}, " \
-                                     f"new overall {happiness_type}: {new_tact_options[option][4][happiness_type]}\n"
-                        string += "--------------------------\n"
+    :param election: A TVA object, which has been run
+    :return: Returns a dictionary with, for every type of happiness, a tuple (has_option, best_happiness) of numpy
+    arrays indexed by agent
+    """
+    return ElectionAnalysis(election).get_tactical_summary()
 
-            string += f"##### ADVANCED TVA: Concurrent voting strategies #####\n\n"
 
-            new_social_outcomes = self.scheme().concurrent_vote(copy(self))
+def summarise_basic_tva(happiness, tactical_summary):
+    """
+    Computes the tactical voting risk, and the average happiness increase of the agents at risk. The last axis of
+    the arrays runs over the agents, so a batch of elections is summarised election by election
 
-            for happiness_type in new_social_outcomes:
+    :param happiness: A dictionary of numpy arrays, holding each agent's happiness for every type of happiness
+    :param tactical_summary: A dictionary of (has_option, best_happiness) tuples, as given by
+    get_basic_tactical_summary
+    :return: Returns a tuple of dictionaries (risks, happiness_increases)
+    """
+    risks = {}
+    happiness_increases = {}
 
-                string += f"For {happiness_type}, the new social outcome if all agents voted concurrently:\n"
+    for key in tactical_summary:
+        has_option, best_happiness = tactical_summary[key]
 
-                winner = new_social_outcomes[happiness_type][0]
-                string += f"The new winner is: {winner} if the following agents voted:\n"
+        n_at_risk = has_option.sum(axis=-1)
+        total_increase = np.where(has_option, best_happiness - happiness[key], 0).sum(axis=-1)
 
-                agent_list = new_social_outcomes[happiness_type][2:]
-                for nested_list in agent_list:
+        risks[key] = n_at_risk / has_option.shape[-1]
+        happiness_increases[key] = np.divide(total_increase, n_at_risk, out=np.zeros_like(total_increase),
+                                             where=n_at_risk > 0)
 
-                    string += f"{str(nested_list[0])}: {nested_list[1]}, is original: {nested_list[2]}\n"
+    return risks, happiness_increases
 
-        return string
 
+def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced, rng=None, culture=None, profile=None):
 
-def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced):
+    election = TVA(n_candidates, voting_scheme, n_voters, is_advanced, rng, profile, culture)
+    election.run()
 
-    candidates = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    candidates = candidates[:n_candidates]
+    analysis = ElectionAnalysis(election)
 
-    election = TVA(candidates, voting_scheme, n_voters, is_advanced)
-    election.run()
+    risks, happiness_increases = summarise_basic_tva(election.get_all_happiness(election.results),
+                                                     analysis.get_tactical_summary())
 
-    risk_preference_happiness_count = 0
-    risk_social_index_count = 0
-
-    basic_tva_happiness_increases = {"H_p": 0, "H_si": 0}
-
-    for agent in election.get_agents():
-
-        old_happiness = agent.get_happiness(election.results)
-
-        tactical_dictionary = election.scheme().tactical_options(agent, election)
-
-        for key in tactical_dictionary:
-            prev_happiness = old_happiness[key]
-            if key == "H_p" and len(tactical_dictionary[key]) > 0:
-                risk_preference_happiness_count += 1
-                maximum_tactical_happiness = 0
-                for index in tactical_dictionary[key]:
-                    tactical_option = tactical_dictionary[key][index]
-                    new_happiness = tactical_option[3][key]
-                    if new_happiness > maximum_tactical_happiness:
-                        maximum_tactical_happiness = new_happiness
-                basic_tva_happiness_increases[key] += maximum_tactical_happiness - prev_happiness
-            elif key == "H_si" and len(tactical_dictionary[key]) > 0:
-                risk_social_index_count += 1
-                maximum_tactical_happiness = 0
-                for index in tactical_dictionary[key]:
-                    tactical_option = tactical_dictionary[key][index]
-                    new_happiness = tactical_option[3][key]
-                    if new_happiness > maximum_tactical_happiness:
-                        maximum_tactical_happiness = new_happiness
-                basic_tva_happiness_increases[key] += maximum_tactical_happiness - prev_happiness
-
-    if basic_tva_happiness_increases["H_p"] != 0:
-        total_increase = basic_tva_happiness_increases["H_p"]
-        basic_tva_happiness_increases["H_p"] = total_increase/risk_preference_happiness_count
-    else:
-        basic_tva_happiness_increases["H_p"] = 0
+    risk_preference_happiness_count = float(risks["H_p"])
+    risk_social_index_count = float(risks["H_si"])
 
-    if basic_tva_happiness_increases["H_si"] != 0:
-        total_increase = basic_tva_happiness_increases["H_si"]
-        basic_tva_happiness_increases["H_si"] = total_increase/risk_social_index_count
-    else:
-        basic_tva_happiness_increases["H_si"] = 0
+    basic_tva_happiness_increases = {key: float(happiness_increases[key]) for key in happiness_increases}
 
-    risk_preference_happiness_count = risk_preference_happiness_count / n_voters
-    risk_social_index_count = risk_social_index_count / n_voters
+    # Defaults for the basic TVA, which has no concurrent or counter voting
+    conc_overall_happiness = {"H_p": 0, "H_si": 0}
+    conc_voting_happiness_increases = {"H_p": 0, "H_si": 0}
+    counter_voting_dict_overall = {"H_p": None, "H_si": None}
+    counter_voting_dict_increases = {"H_p": None, "H_si": None}
 
     if is_advanced:
 
@@ -352,19 +311,18 @@ def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced):
         for Concurrent Voting
         '''
 
-        election_copy = copy(election)
-        concurrent_voting_outcome = election_copy.scheme().concurrent_vote(election_copy)
+        concurrent_voting_outcome = analysis.get_concurrent_outcome()
         conc_voting_happiness_increases = {"H_p": [0, 0], "H_si": [0, 0]}
         conc_overall_happiness = {"H_p": 0, "H_si": 0}
 
         for key in concurrent_voting_outcome:
 
-            election_copy.results = concurrent_voting_outcome[key][1]
-            conc_overall_happiness[key] = election_copy.get_overall_happiness()[key]
+            new_results = concurrent_voting_outcome[key][1]
+            conc_overall_happiness[key] = analysis.snapshot.get_overall_happiness(new_results)[key]
 
             for agent in [tactical_agent for tactical_agent in concurrent_voting_outcome[key][2:]]:
                 old_happiness = agent[0].get_happiness(election.results)[key]
-                new_happiness = agent[0].get_happiness(election_copy.results)[key]
+                new_happiness = agent[0].get_happiness(new_results)[key]
                 conc_voting_happiness_increases[key][0] += new_happiness - old_happiness
                 conc_voting_happiness_increases[key][1] += 1
 
@@ -377,14 +335,11 @@ def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced):
 
         counter_voting_dict_overall = {"H_p": [0, 0], "H_si": [0, 0]}
         counter_voting_dict_increases = {"H_p": [0, 0], "H_si": [0, 0]}
-        agents_copy = [copy(agent) for agent in election.get_agents()]
-
-        for agent in agents_copy:
+        for agent in election.get_agents():
 
-            election_copy = copy(election)
             old_happiness = agent.get_happiness(election.results)
 
-            counter_voting_options = election_copy.scheme().counter_vote(agent, election_copy)
+            counter_voting_options = analysis.get_counter_vote(agent)
 
             for key in counter_voting_options:
                 for counter_set in counter_voting_options[key]:
@@ -403,8 +358,7 @@ def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced):
 
                         else:
 
-                            election_copy.results = counter_set[4]
-                            new_overall_happiness = election_copy.get_overall_happiness()[key]
+                            new_overall_happiness = analysis.snapshot.get_overall_happiness(counter_set[4])[key]
                             counter_voting_dict_overall[key][0] += new_overall_happiness
                             new_happiness = agent.get_happiness(counter_set[4])[key]
                             counter_voting_dict_increases[key][0] += new_happiness - old_happiness[key]
@@ -429,149 +383,463 @@ def create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced):
            counter_voting_dict_overall, counter_voting_dict_increases
 
 
-def run_tests(data_folder, tests, voting_scheme, show_atva_features):
+N_VOTERS_TEST = [2, 3, 4, 5, 6, 7, 8, 9, 10, 15, 20, 30, 50]
+N_CANDIDATES_TEST = [3, 4, 5, 6, 7, 8, 9, 10]
+
+
+def get_election_rng(master_seed, n_candidates, n_voters, repetition):
+    """
+    Derives the random number generator of one election of a sweep from the master seed. The seed is spawned from
+    the position of the election in the grid (not from the order in which elections are run), so a sweep gives
+    the same elections regardless of the number of workers
+
+    :param master_seed: An integer seed for the entire sweep
+    :param n_candidates: An integer for the number of candidates in the election
+    :param n_voters: An integer for the number of voters in the election
+    :param repetition: An integer for the repetition of the election within its grid cell
+    :return: Returns a numpy random Generator
+    """
+    return np.random.default_rng(np.random.SeedSequence(master_seed, spawn_key=(n_candidates, n_voters, repetition)))
+
+
+def run_election_task(task):
+    """
+    Runs a single election of a sweep. This is the unit of work handed to the worker processes by the election engine
+
+    :param task: A tuple (n_voters, n_candidates, voting_scheme, is_advanced, master_seed, repetition, culture)
+    :return: Returns a list with the output of create_and_run_election
+    """
+    n_voters, n_candidates, voting_scheme, is_advanced, master_seed, repetition, culture = task
+
+    rng = get_election_rng(master_seed, n_candidates, n_voters, repetition)
+
+    return [create_and_run_election(n_voters, n_candidates, voting_scheme, is_advanced, rng, culture)]
+
+
+def run_batch_elections(n_elections, n_voters, n_candidates, voting_scheme, rng, culture=None):
+    """
+    Runs the basic TVA for a batch of random elections at once
+
+    :param n_elections: An integer for the number of elections
+    :param n_voters: An integer for the number of voters in every election
+    :param n_candidates: An integer for the number of candidates in every election
+    :param voting_scheme: A string indicating the type of voting
+    :param rng: A numpy random Generator
+    :param culture: A Culture object the preferences are drawn from, defaults to impartial culture
+    :return: Returns a list with, for every election, a tuple in the format of create_and_run_election
+    """
+    scheme = get_voting_scheme(voting_scheme)
+
+    return evaluate_batch_elections(BatchElections.generate(n_elections, n_voters, n_candidates, scheme, rng, culture),
+                                    voting_scheme)
+
+
+def evaluate_batch_elections(batch, voting_scheme):
+    """
+    Runs the basic TVA for a batch of elections. Tallying and computing the happiness are vectorized over the batch;
+    the tactical options are too when the voting scheme has a vectorized form, and are otherwise computed election by
+    election on the ballots of the batch
+
+    :param batch: A BatchElections object
+    :param voting_scheme: A string indicating the type of voting
+    :return: Returns a list with, for every election, a tuple in the format of create_and_run_election
+    """
+    happiness = batch.get_happiness()
+
+    tactical_summary = batch.scheme().get_batch_tactical_summary(batch.profiles, batch.positions, batch.totals)
+
+    if tactical_summary is None:
+        summaries = []
+        for profile in batch.profiles:
+            election = TVA(batch.n_candidates, voting_scheme, batch.n_voters, False, profile=profile)
+            election.run()
+            summaries.append(get_basic_tactical_summary(election))
+
+        tactical_summary = {key: (np.stack([summary[key][0] for summary in summaries]),
+                                  np.stack([summary[key][1] for summary in summaries]))
+                            for key in summaries[0]}
+
+    risks, happiness_increases = summarise_basic_tva(happiness, tactical_summary)
+
+    overall_happiness = batch.get_overall_happiness(happiness)
+
+    return [({key: float(overall_happiness[key][e]) for key in overall_happiness},
+             float(risks["H_p"][e]), float(risks["H_si"][e]),
+             {key: float(happiness_increases[key][e]) for key in happiness_increases},
+             {"H_p": 0, "H_si": 0}, {"H_p": 0, "H_si": 0},
+             {"H_p": None, "H_si": None}, {"H_p": None, "H_si": None})
+            for e in range(batch.n_elections)]
+
+
+def run_batch_task(task):
+    """
+    Runs a chunk of the elections of a grid cell with the batch engine. This is the unit of work handed to the worker
+    processes by the batch engine
+
+    :param task: A tuple (n_voters, n_candidates, voting_scheme, master_seed, chunk, n_elections, culture)
+    :return: Returns a list with the output of every election of the chunk
+    """
+    n_voters, n_candidates, voting_scheme, master_seed, chunk, n_elections, culture = task
+
+    rng = np.random.default_rng(np.random.SeedSequence(master_seed, spawn_key=(n_candidates, n_voters, chunk)))
+
+    return run_batch_elections(n_elections, n_voters, n_candidates, voting_scheme, rng, culture)
+
+
+def run_exact_task(task):
+    """
+    Runs a range of the anonymous profiles of a grid cell with the exact engine. This is the unit of work handed to
+    the worker processes by the exact engine
+
+    Every metric of an election is the same for two profiles that only differ in the order of the voters, so running
+    every multiset of rankings once, weighted by its probability, gives the exact expectation of the metrics over
+    the culture. Profiles are not reduced by relabelling the candidates as well, since ties go to the lowest id
+
+    :param task: A tuple (n_voters, n_candidates, voting_scheme, is_advanced, culture, start, stop)
+    :return: Returns a list with, for every profile of the range, a tuple (probability, output) of the probability of
+    the profile in the culture and the output of its election
+    """
+    n_voters, n_candidates, voting_scheme, is_advanced, culture, start, stop = task
+
+    profiles, codes = get_anonymous_profiles(n_voters, n_candidates, start, stop)
+    probabilities = culture.get_profile_probabilities(codes, n_candidates)
+
+    # Profiles the culture never draws (such as profiles which are not single-peaked) add nothing to the averages
+    profiles, probabilities = profiles[probabilities > 0], probabilities[probabilities > 0]
+
+    if len(profiles) == 0:
+        return []
+
+    if is_advanced:
+        outputs = [create_and_run_election(n_voters, n_candidates, voting_scheme, True, profile=profile)
+                   for profile in profiles]
+    else:
+        outputs = evaluate_batch_elections(BatchElections(profiles, get_voting_scheme(voting_scheme)), voting_scheme)
+
+    return list(zip(probabilities.tolist(), outputs))
+
+
+def run_sweep_task(task):
+    """
+    Runs a task of a sweep with the function of its engine
+
+    :param task: A tuple (task_function, task)
+    :return: Returns the output of the task function
+    """
+    task_function, task = task
+
+    return task_function(task)
+
+
+def get_election_metrics(election_results):
+    """
+    Names the metrics of the output of an election by their column in the results store
+
+    :param election_results: An output of create_and_run_election
+    :return: Returns a dictionary mapping every metric column to the value of the election, None if it was not
+    computed
+    """
+    risks = {"H_p": election_results[1], "H_si": election_results[2]}
+
+    metrics = {}
+    for key in HAPPINESS_TYPES:
+        metrics["basic_average_overall_happiness_" + key] = election_results[0][key]
+        metrics["average_tactical_voting_risk_" + key] = risks[key]
+        metrics["basic_average_happiness_increase_" + key] = election_results[3][key]
+        metrics["conc_average_overall_happiness_" + key] = election_results[4][key]
+        metrics["conc_average_voting_happiness_increases_" + key] = election_results[5][key]
+        metrics["counter_average_voting_dict_overall_" + key] = election_results[6][key]
+        metrics["counter_average_voting_dict_increases_" + key] = election_results[7][key]
+
+    return metrics
+
+
+def accumulate_cell(all_election_results, weights=None, statistics=None):
+    """
+    Adds the outputs of elections of a grid cell to the streaming statistics of every metric, in repetition order.
+    Counter voting is only accumulated over the elections in which it was computed
+
+    :param all_election_results: A list of outputs of create_and_run_election
+    :param weights: A list with the weight of every election, every election counts once when not given
+    :param statistics: A dictionary of the statistics to add the elections to, as returned by accumulate_cell. New
+    statistics are started when not given
+    :return: Returns a dictionary mapping every metric column to its StreamingStatistics object
+    """
+    if weights is None:
+        weights = [1] * len(all_election_results)
+
+    if statistics is None:
+        statistics = {column: StreamingStatistics() for column in METRIC_COLUMNS}
+
+    for election_results, weight in zip(all_election_results, weights):
+        for column, value in get_election_metrics(election_results).items():
+            if value is not None:
+                statistics[column].add(value, weight)
+
+    return statistics
+
+
+def get_cell_row(voting_scheme, n_candidates, n_voters, tests, statistics, confidence=CONFIDENCE, is_exact=False):
+    """
+    Turns the statistics of a grid cell into a row of the results store, with the mean of every metric and the
+    half-width of its confidence interval
+
+    :param voting_scheme: A string indicating the type of voting
+    :param n_candidates: An integer for the number of candidates
+    :param n_voters: An integer for the number of voters
+    :param tests: An integer for the number of elections run for the cell
+    :param statistics: A dictionary of statistics, as returned by accumulate_cell
+    :param confidence: The confidence level of the intervals
+    :param is_exact: A boolean, True if the statistics hold every profile of the cell weighted by its probability, so
+    the means are exact and their intervals have no width
+    :return: Returns a dictionary mapping every column of the results store to its value
+    """
+    row = {"voting_scheme": voting_scheme, "n_candidates": n_candidates, "n_voters": n_voters, "tests": tests}
+
+    z_score = get_z_score(confidence)
+
+    for column in METRIC_COLUMNS:
+        row[column] = statistics[column].get_mean()
+        row[column + "_half_width"] = 0.0 if is_exact else statistics[column].get_half_width(z_score)
+
+    return row
+
+
+def get_stopping_targets(precision):
+    """
+    :param precision: A target half-width for the intervals of the tactical voting risk, or a dictionary mapping
+    metrics of the results store (such as "basic_average_overall_happiness") to target half-widths, or None
+    :return: Returns a dictionary mapping metric columns to the target half-width of their intervals
+    """
+    if precision is None:
+        return {}
+
+    if not isinstance(precision, dict):
+        precision = {"average_tactical_voting_risk": precision}
+
+    targets = {}
+    for metric, target in precision.items():
+        if metric not in METRICS:
+            raise Exception(f"{metric} is not a metric of the results store")
+
+        for key in HAPPINESS_TYPES:
+            targets[f"{metric}_{key}"] = target
+
+    return targets
+
+
+def get_round_size(statistics, targets, z_score, n_run, tests):
+    """
+    Decides how many more elections an adaptive cell runs. A cell runs MIN_ADAPTIVE_TESTS elections first, and then
+    the elections its intervals are estimated to need to reach their targets, never more than doubling its elections
+    in one round
+
+    :param statistics: A dictionary of the statistics of the cell, as returned by accumulate_cell
+    :param targets: A dictionary mapping metric columns to the target half-width of their intervals
+    :param z_score: The number of standard errors on either side of the mean of an interval
+    :param n_run: An integer for the number of elections the cell has run
+    :param tests: An integer for the maximum number of elections of the cell
+    :return: Returns an integer for the number of elections of the next round, 0 if the cell is finished
+    """
+    if n_run < MIN_ADAPTIVE_TESTS:
+        return min(MIN_ADAPTIVE_TESTS, tests) - n_run
+
+    needed = n_run
+    for column, target in targets.items():
+        half_width = statistics[column].get_half_width(z_score)
+
+        # A metric computed in too few elections (such as counter voting) is not known well enough to stop
+        if np.isnan(half_width):
+            needed = tests
+        elif half_width > target:
+            needed = max(needed, int(np.ceil(n_run * (half_width / target) ** 2)))
+
+    return min(needed - n_run, n_run, tests - n_run)
+
+
+def run_tests(data_folder, tests, voting_scheme, show_atva_features, workers=1, seed=None, engine="election",
+              culture=None, precision=None, confidence=CONFIDENCE):
+    """
+    Runs a number of elections for every cell of the (candidates x voters) grid, and writes the averages of every
+    cell as one row of the columnar results store data_folder/results_<voting_scheme>.npz (see load_results). The
+    store of a sweep over another culture than impartial culture is named results_<voting_scheme>_<culture>.npz
+
+    The elections can be farmed out to a pool of worker processes. Every election draws its preferences from a seed
+    spawned from the master seed, and the cells are summed in repetition order, so the results are identical for
+    any number of workers. The cells are handed out by a SweepScheduler, most predicted work first and split into
+    chunks, and the timings calibrating its cost model are kept in data_folder/cache/costs.json
+
+    Every metric is stored with the half-width of its confidence interval. Given a precision, the cells stop
+    adaptively: they run elections in rounds until the intervals of the targeted metrics are narrow enough, and tests
+    is the most elections a cell runs. Easy cells then finish after a few rounds, and the elections go to the cells
+    with the most variance. The rounds of all cells run side by side, and a round only depends on the elections
+    before it, so the results are still identical for any number of workers
+
+    Finished cells are persisted in a cache in data_folder/cache/, keyed by everything their results depend on.
+    Cells found in the cache are not run again, so an interrupted or extended sweep only runs the missing cells
+
+    :param data_folder: A string for the folder in which the results of every voting scheme are stored
+    :param tests: An integer for the number of elections per grid cell, the maximum number when stopping adaptively
+    :param voting_scheme: A string indicating the type of voting
+    :param show_atva_features: A boolean, True if the advanced TVA should be run
+    :param workers: An integer for the number of worker processes, 1 runs the sweep in this process
+    :param seed: An integer master seed, a fresh one is drawn (and printed) if not given
+    :param engine: "election" to run the elections one by one, "batch" to run the elections of a cell in batches of
+    BATCH_SIZE (basic TVA only), or "exact" to compute the exact expectations of the cells with at most tests
+    anonymous profiles (see run_exact_task), running the elections of the other cells one by one
+    :param culture: A Culture object the preferences of every election are drawn from, defaults to impartial culture
+    :param precision: A target half-width for the intervals of the tactical voting risk, or a dictionary mapping
+    metrics of the results store to target half-widths (see get_stopping_targets), to stop the cells adaptively.
+    Every cell runs all tests when not given
+    :param confidence: The confidence level of the intervals
+    :return: void
+    """
 
     print("##########################TESTS########################################")
 
-    n_voters_test = [2, 3, 4, 5, 6, 7, 8, 9, 10, 15, 20, 30, 50]
-    n_candidates_test = [3, 4, 5, 6, 7, 8, 9, 10]
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    if culture is None:
+        culture = ImpartialCulture()
+
+    print(f"Running tests for {voting_scheme} with seed {seed}...")
+
+    if not os.path.exists(data_folder):
+        os.mkdir(data_folder)
+
+    cells = [(n_candidates, n_voters) for n_candidates in N_CANDIDATES_TEST for n_voters in N_VOTERS_TEST]
+
+    # Cells of which every anonymous profile is enumerated by the exact engine, whose elections are weighted by the
+    # probability of their profile
+    is_exact = [engine == "exact" and count_anonymous_profiles(n_voters, n_candidates) <= tests
+                for n_candidates, n_voters in cells]
+
+    if engine == "batch":
+        if show_atva_features:
+            raise Exception("The batch engine only runs the basic TVA")
+
+        cell_task_sizes = [[min(BATCH_SIZE, tests - chunk * BATCH_SIZE) for chunk in range(-(-tests // BATCH_SIZE))]
+                           for _ in cells]
+        cell_tasks = [[(run_batch_task, (n_voters, n_candidates, voting_scheme, seed, chunk, n_elections, culture))
+                       for chunk, n_elections in enumerate(task_sizes)]
+                      for (n_candidates, n_voters), task_sizes in zip(cells, cell_task_sizes)]
+
+    elif engine in ("election", "exact"):
+        # Every election is a task of its own, and the exact cells are not stopped adaptively
+        cell_task_sizes = []
+        cell_tasks = []
+        for (n_candidates, n_voters), exact in zip(cells, is_exact):
+            if exact:
+                n_profiles = count_anonymous_profiles(n_voters, n_candidates)
+                starts = range(0, n_profiles, BATCH_SIZE)
+                cell_task_sizes.append([min(BATCH_SIZE, n_profiles - start) for start in starts])
+                cell_tasks.append([(run_exact_task, (n_voters, n_candidates, voting_scheme, show_atva_features,
+                                                     culture, start, min(start + BATCH_SIZE, n_profiles)))
+                                   for start in starts])
+            else:
+                cell_task_sizes.append([1] * tests)
+                cell_tasks.append([(run_election_task, (n_voters, n_candidates, voting_scheme, show_atva_features,
+                                                        seed, i, culture))
+                                   for i in range(tests)])
 
-    print(f"Running tests for {voting_scheme}...")
+    else:
+        raise Exception(f"{engine} is not a sweep engine")
 
-    for curr_n_candidates in n_candidates_test:
-        n_candidates = curr_n_candidates
-        for curr_n_voters in n_voters_test:
-            n_voters = curr_n_voters
+    targets = get_stopping_targets(precision)
+    z_score = get_z_score(confidence)
 
-            print(f"Running for {n_candidates} candidates with {curr_n_voters} voters")
+    cache = SweepCache(data_folder + "cache/")
+    cell_keys = [SweepCache.get_key(voting_scheme, n_candidates, n_voters, tests, seed, show_atva_features, engine,
+                                    SWEEP_ENGINE_VERSION, repr(culture), [targets, confidence])
+                 for n_candidates, n_voters in cells]
+    rows = [cache.get(key) for key in cell_keys]
 
-            j, k = 0, 0
-            total_basic_overall_happiness = {"H_p": 0, "H_si": 0}
-            total_risk_percentage_my_preference = 0
-            total_risk_percentage_social_outcome = 0
-            total_basic_happiness_increase = {"H_p": 0, "H_si": 0}
-            total_conc_overall_happiness = {"H_p": 0, "H_si": 0}
-            total_conc_voting_happiness_increases = {"H_p": 0, "H_si": 0}
-            counter_voting_dict_overall = {"H_p": 0, "H_si": 0}
-            counter_voting_dict_increases = {"H_p": 0, "H_si": 0}
+    results_path = data_folder + "results_" + voting_scheme + ".npz"
+    if not isinstance(culture, ImpartialCulture):
+        results_path = data_folder + "results_" + voting_scheme + "_" + culture.get_name() + ".npz"
 
-            for i in range(tests):
+    for (n_candidates, n_voters), row in zip(cells, rows):
+        if row is not None:
+            print(f"Found {n_candidates} candidates with {n_voters} voters in the cache")
 
-                election_results = create_and_run_election(n_voters, n_candidates, voting_scheme, show_atva_features)
+    if any(row is not None for row in rows):
+        write_results(results_path, [row for row in rows if row is not None])
 
-                for key in election_results[0]:
-                    total_basic_overall_happiness[key] += election_results[0][key]
+    # Only the cells which have not been finished before are run. Every running cell keeps the statistics of its
+    # metrics, the number of its tasks handed out and of its elections run so far
+    running = {i: [None, 0, 0] for i, row in enumerate(rows) if row is None}
 
-                total_risk_percentage_my_preference += election_results[1]
-                total_risk_percentage_social_outcome += election_results[2]
+    # The scheduler predicts the cost of every cell from the timings of earlier cells and sweeps
+    cost_model_path = data_folder + "cache/costs.json"
+    cost_model = CostModel.load(cost_model_path)
+    cost_keys = [("exact" if exact else "batch" if engine == "batch" else "election", voting_scheme, show_atva_features)
+                 for exact in is_exact]
 
-                for key in election_results[3]:
-                    elect_3 = election_results[3][key]
-                    total_basic_happiness_increase[key] += elect_3
+    executor = None if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+    scheduler = SweepScheduler(cost_model, executor, workers)
 
-                for key in election_results[4]:
-                    elect_4 = election_results[4][key]
-                    total_conc_overall_happiness[key] += elect_4
+    def get_next_job(i):
+        """
+        Starts the next round of a running cell. A cell runs all its tasks in a single round, unless it stops
+        adaptively
 
-                for key in election_results[5]:
-                    elect_5 = election_results[5][key]
-                    total_conc_voting_happiness_increases[key] += elect_5
+        :param i: An integer for the index of a running cell
+        :return: Returns the job of the round, for the scheduler
+        """
+        statistics, start, n_run = running[i]
+
+        if is_exact[i] or not targets:
+            end = len(cell_tasks[i])
+        else:
+            round_size = get_round_size(statistics, targets, z_score, n_run, tests)
+            end = start
+            while round_size > 0:
+                round_size -= cell_task_sizes[i][end]
+                end += 1
+
+        running[i][1] = end
+
+        return i, (cost_keys[i],) + cells[i], cell_tasks[i][start:end], cell_task_sizes[i][start:end]
+
+    try:
+        for i in running:
+            scheduler.add(get_next_job(i))
+
+        # A cell goes on with its next round as soon as its last round is back, and the cells finish in the order in
+        # which the scheduler completes them. A round only depends on the elections of the cell before it
+        for i, all_election_results in scheduler.run(run_sweep_task):
+            n_candidates, n_voters = cells[i]
+
+            cell = running[i]
+            if is_exact[i]:
+                probabilities = [probability for probability, _ in all_election_results]
+                all_election_results = [output for _, output in all_election_results]
+                cell[0] = accumulate_cell(all_election_results, probabilities, cell[0])
+            else:
+                cell[0] = accumulate_cell(all_election_results, statistics=cell[0])
+            cell[2] += len(all_election_results)
 
-                for key in election_results[6]:
-                    elect_6 = election_results[6][key]
-                    if elect_6 is not None:
-                        counter_voting_dict_overall[key] += elect_6
-                        if key == "percentage_my_preference":
-                            j += 1
-                        else:
-                            k += 1
-
-                for key in election_results[7]:
-                    elect_7 = election_results[7][key]
-                    if elect_7 is not None:
-                        counter_voting_dict_increases[key] += elect_7
-
-            if not os.path.exists(data_folder + voting_scheme):
-                os.mkdir(data_folder + voting_scheme)
-
-            with open(data_folder + voting_scheme + "/results_" + voting_scheme + "_n_candidates_" + str(
-                            n_candidates) + "_n_voters_" + str(n_voters) + ".txt", "w") as out_file:
-
-                out_file.write("Voting Scheme: " + voting_scheme)
-                out_file.write("\n")
-
-                basic_average_overall_happiness = {}
-                for key in total_basic_overall_happiness:
-                    basic_average_overall_happiness[key] = total_basic_overall_happiness[key] / tests
-
-                out_file.write("basic_average_overall_happiness")
-                out_file.write("\n")
-                out_file.write(str(basic_average_overall_happiness))
-                out_file.write("\n")
-
-                out_file.write("Average tactical voting risk for percentage_my_preference: ")
-                out_file.write("\n")
-                out_file.write(str(total_risk_percentage_my_preference / tests))
-                out_file.write("\n")
-                out_file.write("Average tactical voting risk for percentage_social_index: ")
-                out_file.write("\n")
-                out_file.write(str(total_risk_percentage_social_outcome / tests))
-                out_file.write("\n")
-
-                basic_average_happiness_increase = {}
-                for key in total_basic_happiness_increase:
-                    basic_average_happiness_increase[key] = total_basic_happiness_increase[key] / tests
-
-                out_file.write("basic_average_happiness_increase")
-                out_file.write("\n")
-                out_file.write(str(basic_average_happiness_increase))
-                out_file.write("\n")
-
-                conc_average_overall_happiness = {}
-                for key in total_conc_overall_happiness:
-                    conc_average_overall_happiness[key] = total_conc_overall_happiness[key] / tests
-
-                out_file.write("conc_average_overall_happiness")
-                out_file.write("\n")
-                out_file.write(str(conc_average_overall_happiness))
-                out_file.write("\n")
-
-                conc_average_voting_happiness_increases = {}
-                for key in total_conc_voting_happiness_increases:
-                    conc_average_voting_happiness_increases[key] = total_conc_voting_happiness_increases[key] / tests
-
-                out_file.write("conc_average_voting_happiness_increases")
-                out_file.write("\n")
-                out_file.write(str(conc_average_voting_happiness_increases))
-                out_file.write("\n")
-
-                counter_average_voting_dict_overall = {}
-                for key in counter_voting_dict_overall:
-                    if key == "percentage_my_preference" and j != 0:
-                        counter_average_voting_dict_overall[key] = counter_voting_dict_overall[key] / j
-                    elif k != 0:
-                        counter_average_voting_dict_overall[key] = counter_voting_dict_overall[key] / k
-
-                out_file.write("counter_average_voting_dict_overall")
-                out_file.write("\n")
-                out_file.write(str(counter_average_voting_dict_overall))
-                out_file.write("\n")
-
-                counter_average_voting_dict_increases = {}
-                for key in counter_voting_dict_increases:
-                    if key == "percentage_my_preference" and j != 0:
-                        counter_average_voting_dict_increases[key] = counter_voting_dict_increases[key] / j
-                    elif k != 0:
-                        counter_average_voting_dict_increases[key] = counter_voting_dict_increases[key] / k
-
-                out_file.write("counter_average_voting_dict_increases")
-                out_file.write("\n")
-                out_file.write(str(counter_average_voting_dict_increases))
-                out_file.write("\n")
-
-                out_file.write(str(j) + ", " + str(k))
-
-    print(f"Tests were run for {voting_scheme}, and saved in {data_folder+voting_scheme}")
+            statistics, n_tasks, n_run = cell
+            if n_tasks < len(cell_tasks[i]) and get_round_size(statistics, targets, z_score, n_run, tests) > 0:
+                scheduler.add(get_next_job(i))
+                continue
+
+            print(f"Ran {n_candidates} candidates with {n_voters} voters")
+
+            rows[i] = get_cell_row(voting_scheme, n_candidates, n_voters, n_run, statistics, confidence, is_exact[i])
+            cache.put(cell_keys[i], rows[i])
+            del running[i]
+
+            # The store is rewritten after every cell, so an interrupted sweep keeps its finished cells
+            write_results(results_path, [row for row in rows if row is not None])
+    finally:
+        cost_model.save(cost_model_path)
+
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    print(f"Tests were run for {voting_scheme}, and saved in {results_path}")
 
 
 if __name__ == "__main__":
@@ -583,10 +851,11 @@ if __name__ == "__main__":
 
     show_atva_features = True
 
-    # Candidates are assumed to be letters of the alphabet
+    # Candidates are labelled by a string of letters, a list of labels, or just counted (TVA(100, ...) labels them 0-99)
     candidates = "ABCDEFGIJK"
 
-    # Voting schemes must be written out with the first letter capitalised; Plurality, AntiPlurality, VotingForTwo, Borda
+    # Voting schemes must be written out with the first letter capitalised; Plurality, AntiPlurality, VotingForTwo, Borda,
+    # KApproval, TruncatedBorda, Dowdall
     voting_scheme = "Borda"
     voters = 3
 
@@ -594,7 +863,7 @@ if __name__ == "__main__":
     election = TVA(candidates, voting_scheme, voters, show_atva_features)
     election.run()
 
-    print(election.get_report())
+    election.write_report(TextSink(sys.stdout))
     print("\n")
 
     # Here multiple elections can be run to see average results over multiple elections
@@ -602,7 +871,14 @@ if __name__ == "__main__":
 
         tests = 2
 
-        run_tests(data_folder, tests, voting_scheme, show_atva_features)
+        # Number of worker processes for the sweep, and the master seed that makes it reproducible
+        workers = os.cpu_count()
+        seed = 2022
+
+        # Preferences are drawn from impartial culture; pass for example culture=Mallows(phi=0.5), Urn(alpha=0.1),
+        # ImpartialAnonymousCulture() or SinglePeaked() from simulation.cultures for another culture
+        run_tests(data_folder, tests, voting_scheme, show_atva_features, workers, seed)
 
     # In order to visualise results, please run mas_visualization.ipynb in a Jupyter environment
-    # The notebook requires tests to be run for all voting schemes
+    # The notebook requires tests to be run for all voting schemes, and loads their results with
+    # simulation.results_store.load_results
@@ -0,0 +1,167 @@
+from math import factorial
+import numpy as np
+
+from agents.agent import get_ballot_dtype
+from agents.happiness import get_position_matrix, get_profile_happiness
+from voting.positional_tally import tally_positions
+
+# Largest number of candidates for which every Lehmer code fits in a 64 bit integer (20! < 2^63)
+MAX_LEHMER_CANDIDATES = 20
+
+
+def get_lehmer_codes(profile):
+    """
+    Encodes every ranking of a ballot matrix as its Lehmer code, the index of the ranking among all m! rankings in
+    lexicographic order. Digit i of the code counts the candidates after position i with a lower index than the
+    candidate at position i
+
+    :param profile: A numpy matrix (voters x positions) of candidate indices in preference order
+    :return: Returns a numpy array of int64 codes, one per voter
+    """
+    m = profile.shape[-1]
+    if m > MAX_LEHMER_CANDIDATES:
+        raise Exception(f"Rankings of {m} candidates do not fit in a Lehmer code of 64 bits")
+
+    later = np.triu(np.ones((m, m), dtype=bool), k=1)
+    digits = ((profile[..., :, None] > profile[..., None, :]) & later).sum(axis=-1)
+    place_values = np.array([factorial(m - 1 - i) for i in range(m)], dtype=np.int64)
+
+    return digits.astype(np.int64) @ place_values
+
+
+def get_rankings(codes, n_candidates):
+    """
+    Decodes Lehmer codes into rankings, the inverse of get_lehmer_codes
+
+    :param codes: A numpy array of Lehmer codes
+    :param n_candidates: An integer for the number of candidates in the election
+    :return: Returns a numpy matrix (codes x positions) of candidate indices in preference order
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    rows = np.arange(len(codes))
+
+    remaining = np.broadcast_to(np.arange(n_candidates), (len(codes), n_candidates))
+    rankings = np.empty((len(codes), n_candidates), dtype=get_ballot_dtype(n_candidates))
+
+    for i in range(n_candidates):
+        place_value = factorial(n_candidates - 1 - i)
+        digits = codes // place_value
+        codes = codes % place_value
+
+        rankings[:, i] = remaining[rows, digits]
+
+        # The chosen candidate is taken out of the candidates which are still to be placed
+        kept = np.ones(remaining.shape, dtype=bool)
+        kept[rows, digits] = False
+        remaining = remaining[kept].reshape(len(rows), n_candidates - 1 - i)
+
+    return rankings
+
+
+def get_ranking_groups(profile):
+    """
+    Groups the voters of a ballot matrix by their ranking, with the distinct rankings in lexicographic order. The
+    rankings are grouped by their Lehmer codes, and rankings of more than MAX_LEHMER_CANDIDATES candidates by their
+    rows, which is slower but works for any number of candidates
+
+    :param profile: A numpy matrix (voters x positions) of candidate indices in preference order
+    :return: Returns a tuple (first_voters, groups, counts) of numpy arrays: the first voter casting every distinct
+    ranking, the group of every voter (an index into first_voters), and the number of voters in every group
+    """
+    if profile.shape[1] <= MAX_LEHMER_CANDIDATES:
+        keys, axis = get_lehmer_codes(profile), None
+    else:
+        keys, axis = profile, 0
+
+    _, first_voters, groups, counts = np.unique(keys, axis=axis, return_index=True, return_inverse=True,
+                                                return_counts=True)
+
+    return first_voters, groups.ravel(), counts
+
+
+class CountedProfile:
+    """
+    Anonymous representation of a profile: every distinct ranking once, together with its multiplicity
+
+    Positional scoring rules only depend on how many voters cast each ranking, and all voters casting a ranking are
+    equally happy, so an election is tallied and its happiness measured in O(distinct rankings * m) instead of
+    O(voters * m). With 8 candidates there are at most 40320 distinct rankings, whatever the number of voters. The
+    multiplicities can be any non-negative weights, which gives weighted voters
+    """
+
+    def __init__(self, rankings, counts, first_voters, groups):
+        """
+        Constructor for a counted profile
+
+        :param rankings: A numpy matrix (distinct rankings x positions) of candidate indices in preference order
+        :param counts: A numpy array with the multiplicity (or total weight) of every distinct ranking
+        :param first_voters: A numpy array with the first voter casting every distinct ranking
+        :param groups: A numpy array with the distinct ranking of every voter, as an index into the rankings
+        """
+        self.rankings = rankings
+        self.counts = np.asarray(counts)
+        self.first_voters = first_voters
+        self.groups = groups
+        self.n_candidates = rankings.shape[1]
+
+        if len(self.rankings) != len(self.counts):
+            raise Exception("Every distinct ranking of a counted profile needs exactly one count")
+
+        self.positions = get_position_matrix(self.rankings)
+
+    @classmethod
+    def from_profile(cls, profile, weights=None):
+        """
+        Counts the distinct rankings of a ballot matrix, see get_ranking_groups
+
+        :param profile: A numpy matrix (voters x positions) of candidate indices in preference order
+        :param weights: A numpy array with the weight of every voter, every voter counts once when not given
+        :return: Returns a CountedProfile object
+        """
+        first_voters, groups, counts = get_ranking_groups(profile)
+
+        if weights is not None:
+            weights = np.asarray(weights)
+            counts = np.bincount(groups, weights=weights, minlength=len(first_voters))
+            if np.issubdtype(weights.dtype, np.integer):
+                counts = counts.astype(np.int64)
+
+        return cls(profile[first_voters], counts, first_voters, groups)
+
+    def __len__(self):
+        """
+        :return: Returns the number of distinct rankings
+        """
+        return len(self.rankings)
+
+    def tally(self, scores):
+        """
+        Tallies the profile: every distinct ranking gives its scores once, multiplied by its count
+
+        :param scores: A numpy array of scores, where index i holds the score of the i-th preference
+        :return: Returns a numpy array of tallied votes, indexed by candidate. The votes are integers when the counts
+        are
+        """
+        return tally_positions(self.rankings, scores, self.n_candidates, self.counts)
+
+    def get_all_happiness(self, totals):
+        """
+        Computes the happiness of every voter for the given outcome, once per distinct ranking
+
+        :param totals: A numpy array of tallied votes, indexed by candidate
+        :return: Returns a dictionary of numpy arrays, holding the happiness of every voter for every type of happiness
+        """
+        happiness = get_profile_happiness(totals, self.rankings, self.positions)
+
+        return {key: happiness[key][self.groups] for key in happiness}
+
+    def get_overall_happiness(self, totals):
+        """
+        Computes the average happiness of all voters for the given outcome, weighing every ranking by its count
+
+        :param totals: A numpy array of tallied votes, indexed by candidate
+        :return: Returns a dictionary with the overall happiness for every type of happiness
+        """
+        happiness = get_profile_happiness(totals, self.rankings, self.positions)
+
+        return {key: float(np.average(happiness[key], weights=self.counts)) for key in happiness}
@@ -0,0 +1,66 @@
+import numpy as np
+
+from voting.ranked_results import RankedResults
+
+
+class DeltaTally:
+    """
+    Incremental tally engine for re-electing when a single agent changes their ballot
+
+    The scores given by all other agents (the residual) are computed once from the current results. The outcome of
+    any alternative ballot of the focal agent is then the residual plus the scores of that ballot, which costs O(m)
+    instead of a re-election over all N agents. Only the candidates whose score differs from the cast ballot move in
+    the ranking of the results
+    """
+
+    def __init__(self, voting_scheme, candidates, results, agent, ballot=None):
+        """
+        Constructor for the delta tally
+
+        :param voting_scheme: A voting scheme object (Borda, Plurality, etc.)
+        :param candidates: A dictionary of the candidates in the election
+        :param results: A dictionary of the tallied votes, including the focal agent's ballot
+        :param agent: The agent object whose ballot is being changed
+        :param ballot: The ballot the agent cast in the results, as candidate indices, defaults to their own ballot
+        """
+        self.candidates = list(candidates)
+        self.candidate_indices = {candidate: i for i, candidate in enumerate(self.candidates)}
+        self.score_vector = voting_scheme.get_score_vector(len(self.candidates))
+
+        self.results = RankedResults.of(results)
+
+        totals = np.array([results[candidate] for candidate in self.candidates], dtype=np.int64)
+        self.cast_scores = self.get_ballot_scores(agent.ballot if ballot is None else list(ballot))
+        self.residual = totals - self.cast_scores
+
+    def get_ballot_scores(self, ballot):
+        """
+        Scores a single ballot
+
+        :param ballot: A sequence of candidate indices in preference order
+        :return: Returns a numpy array with the score the ballot gives each candidate
+        """
+        scores = np.zeros(len(self.candidates), dtype=np.int64)
+        scores[ballot] = self.score_vector
+
+        return scores
+
+    def get_residual_results(self):
+        """
+        :return: Returns the tallied votes of all agents except the focal agent, as RankedResults
+        """
+        return RankedResults(zip(self.candidates, self.residual.tolist()))
+
+    def get_results(self, preferences):
+        """
+        Re-elects with the focal agent voting the given preferences
+
+        :param preferences: An iterable of candidates in preference order (a list, or a preference dictionary)
+        :return: Returns the tallied votes for each candidate, as RankedResults
+        """
+        ballot = [self.candidate_indices[candidate] for candidate in preferences]
+
+        totals = self.residual + self.get_ballot_scores(ballot)
+        changed = np.flatnonzero(totals != self.residual + self.cast_scores).tolist()
+
+        return self.results.with_votes({self.candidates[i]: int(totals[i]) for i in changed})
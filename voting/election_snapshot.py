@@ -0,0 +1,165 @@
+import numpy as np
+
+from agents.happiness import get_position_matrix
+from voting.counted_profile import CountedProfile
+from voting.ranked_results import RankedResults
+
+
+class ElectionSnapshot:
+    """
+    Immutable snapshot of an election: the sincere ballot matrix of the agents, the ballots they actually cast, and
+    the outcome of those ballots
+
+    Asking what happens if some agents cast other ballots derives a new snapshot, which shares the ballot matrix and
+    the agents with this one and only differs in the cast ballots and the outcome. Nothing is ever changed in place,
+    so snapshots can be shared between analyses, threads and processes. The happiness of the agents is always
+    measured on their sincere ballots
+    """
+
+    def __init__(self, candidates, voting_scheme, profile, agents, totals, positions=None, cast_ballots=None,
+                 results=None, counted_profile=None):
+        """
+        Constructor for a snapshot
+
+        :param candidates: An iterable of the candidates in the election
+        :param voting_scheme: A voting scheme class (Borda, Plurality, etc.)
+        :param profile: A numpy matrix (voters x positions) of the sincere ballots, as candidate indices
+        :param agents: A list of agent objects, viewing the rows of the profile
+        :param totals: A numpy array of tallied votes of the cast ballots, indexed by candidate
+        :param positions: The position matrix of the profile, computed from the profile when not given
+        :param cast_ballots: A dictionary mapping the name of an agent to the ballot they cast (a tuple of candidate
+        indices), for the agents not casting their sincere ballot
+        :param results: The RankedResults of the totals, ranked from the totals when not given
+        :param counted_profile: The CountedProfile of the profile, counted from the profile when not given
+        """
+        self.candidates = dict.fromkeys(candidates, 0)
+        self.scheme = voting_scheme
+
+        self.profile = profile.view()
+        self.profile.flags.writeable = False
+
+        if positions is None:
+            positions = get_position_matrix(profile)
+        self.positions = positions.view()
+        self.positions.flags.writeable = False
+
+        self.counted_profile = CountedProfile.from_profile(profile) if counted_profile is None else counted_profile
+
+        self.agents = tuple(agents)
+        self.cast_ballots = {} if cast_ballots is None else dict(cast_ballots)
+
+        self.totals = np.array(totals, dtype=np.int64)
+        self.totals.flags.writeable = False
+
+        self._results = results
+
+    @classmethod
+    def of(cls, tva_object):
+        """
+        Takes a snapshot of an election
+
+        :param tva_object: A TVA object which has been run, or a snapshot, which is returned as is
+        :return: Returns an ElectionSnapshot object
+        """
+        if isinstance(tva_object, cls):
+            return tva_object
+
+        return cls(tva_object.candidates, tva_object.scheme, tva_object.profile, tva_object.get_agents(),
+                   tva_object.get_totals(tva_object.results), tva_object.positions,
+                   counted_profile=tva_object.counted_profile)
+
+    @property
+    def results(self):
+        """
+        :return: Returns the tallied votes of the cast ballots for each candidate, as RankedResults. They are shared by
+        every user of the snapshot, and must not be changed
+        """
+        if self._results is None:
+            self._results = RankedResults(zip(self.candidates, self.totals.tolist()))
+
+        return self._results
+
+    def get_agents(self):
+        """
+        :return: Returns a list of agent objects in the election
+        """
+        return list(self.agents)
+
+    def get_totals(self, results):
+        """
+        Converts a dictionary of results into a vector of tallied votes
+
+        :param results: A dictionary of results
+        :return: Returns a numpy array of tallied votes, indexed by candidate
+        """
+        return np.array([results[candidate] for candidate in self.candidates], dtype=np.int64)
+
+    def get_all_happiness(self, results):
+        """
+        Computes the happiness of every agent for the given results, measured on their sincere ballots
+
+        :param results: A dictionary of results
+        :return: Returns a dictionary of numpy arrays, holding each agent's happiness for every type of happiness
+        """
+        return self.counted_profile.get_all_happiness(self.get_totals(results))
+
+    def get_overall_happiness(self, results=None):
+        """
+        Computes the average happiness of all agents, once per distinct sincere ranking
+
+        :param results: A dictionary of results, defaults to the results of the snapshot
+        :return: Returns a dictionary with the overall happiness for every type of happiness
+        """
+        return self.counted_profile.get_overall_happiness(self.get_totals(self.results if results is None else results))
+
+    def get_cast_ballot(self, agent):
+        """
+        :param agent: An agent object of the election
+        :return: Returns the ballot the agent cast, as a tuple of candidate indices
+        """
+        if agent.name in self.cast_ballots:
+            return self.cast_ballots[agent.name]
+
+        return tuple(agent.ballot.tolist())
+
+    def with_ballot(self, agent, preferences):
+        """
+        Derives the snapshot in which one agent casts another ballot
+
+        :param agent: An agent object of the election
+        :param preferences: An iterable of candidates in preference order (a list, or a preference dictionary)
+        :return: Returns a new ElectionSnapshot object
+        """
+        return self.with_ballots({agent: preferences})
+
+    def with_ballots(self, ballots):
+        """
+        Derives the snapshot in which some agents cast other ballots. Only the scores of the changed ballots are
+        tallied again, and only the candidates whose votes change move in the ranking of the results
+
+        :param ballots: A dictionary mapping agent objects to an iterable of candidates in preference order
+        :return: Returns a new ElectionSnapshot object
+        """
+        candidate_indices = {candidate: i for i, candidate in enumerate(self.candidates)}
+        score_vector = self.scheme.get_score_vector(len(self.candidates))
+
+        totals = self.totals.copy()
+        cast_ballots = dict(self.cast_ballots)
+
+        for agent, preferences in ballots.items():
+            ballot = tuple(candidate_indices[candidate] for candidate in preferences)
+
+            totals[list(self.get_cast_ballot(agent))] -= score_vector
+            totals[list(ballot)] += score_vector
+
+            if ballot == tuple(agent.ballot.tolist()):
+                cast_ballots.pop(agent.name, None)
+            else:
+                cast_ballots[agent.name] = ballot
+
+        candidates = list(self.candidates)
+        results = self.results.with_votes({candidates[i]: int(totals[i])
+                                           for i in np.flatnonzero(totals != self.totals).tolist()})
+
+        return ElectionSnapshot(self.candidates, self.scheme, self.profile, self.agents, totals, self.positions,
+                                cast_ballots, results, self.counted_profile)
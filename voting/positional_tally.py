@@ -0,0 +1,42 @@
+import numpy as np
+
+# Largest tally that fits in a 64 bit integer
+MAX_TALLY = np.iinfo(np.int64).max
+
+
+def tally_positions(ballots, scores, n_bins, weights=None):
+    """
+    Tallies ballots under a positional scoring rule. The ballots are counted per (candidate, position) first, and the
+    counts are multiplied with the score vector in integer arithmetic, so integer scores give exact integer tallies
+    however large they are. Summing the scores themselves with a weighted bincount would add them up in float64,
+    which rounds tallies past 2^53
+
+    :param ballots: A numpy matrix (ballots x positions) of bin indices (candidate indices, possibly offset per
+    election) in preference order
+    :param scores: A numpy array of int64 scores, where index i holds the score of the i-th preference
+    :param n_bins: An integer for the number of bins to tally into
+    :param weights: A numpy array with the weight of every ballot, every ballot counts once when not given. The tallies
+    are only integers when the weights are
+    :return: Returns a numpy array with the tallied votes of every bin - raises a ValueError if an integer tally may
+    not fit in 64 bits
+    """
+    n_positions = ballots.shape[1]
+    cells = (ballots.astype(np.int64) * n_positions + np.arange(n_positions)).ravel()
+
+    if weights is None:
+        counts = np.bincount(cells, minlength=n_bins * n_positions)
+    else:
+        weights = np.asarray(weights)
+        counts = np.bincount(cells, weights=np.repeat(weights, n_positions), minlength=n_bins * n_positions)
+
+    counts = counts.reshape(n_bins, n_positions)
+
+    if weights is not None and not np.issubdtype(weights.dtype, np.integer):
+        return counts @ scores.astype(np.float64)
+
+    # Every bin gets at most the largest score from every time it appears on a ballot
+    most_votes = int(counts.sum(axis=1).max(initial=0)) * int(np.abs(scores).max(initial=0))
+    if most_votes > MAX_TALLY:
+        raise ValueError(f"Tallies of up to {most_votes} votes do not fit in 64 bit integers")
+
+    return counts.astype(np.int64) @ scores
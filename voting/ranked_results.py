@@ -0,0 +1,219 @@
+from bisect import bisect_left
+
+# A change of the votes of more than 1 in this many candidates ranks the candidates again, instead of moving them
+RERANK_FRACTION = 8
+
+
+class RankedResults(dict):
+    """
+    Results of an election, which keep the candidates ranked by their votes
+
+    The results are a dictionary of tallied votes like any other, with the candidates in the order of their ids. Next
+    to it, they keep the ordering of the candidates from first to last place (ties going to the lowest id, as in
+    get_winner) and the place of every candidate, so the winner and the place of a candidate are looked up in O(1)
+
+    The candidates of an election are fixed, so the results cannot lose a candidate: the dictionary methods removing
+    one raise an exception, and the other ones keep the ranking in sync like setting votes does
+
+    Changing the votes of a candidate moves it within the ordering, which takes O(m): its new place is found by
+    bisection in O(log m), but deleting and inserting it shifts the ordering and its sort keys (a memmove of up to m
+    pointers), and the candidates it passes are given their new places. For elections of up to a few hundred
+    candidates, that shift costs less than the pointer chasing of a balanced tree with O(log m) updates in Python. A
+    ballot swap only moves the few candidates whose scores change, by small deltas, so deriving its results does not
+    sort the candidates again. When many candidates change at once, ranking them again is cheaper, and update does
+    so
+    """
+
+    def __init__(self, results):
+        """
+        Constructor for ranked results
+
+        :param results: A dictionary of tallied votes, with the candidates in the order of their ids
+        """
+        super().__init__(results)
+
+        self.ids = dict(zip(self, range(len(self))))
+        self.rank()
+
+    def rank(self):
+        """
+        Ranks all candidates by their votes. The sort is stable, so tied candidates stay in the order of their ids
+
+        :return: void
+        """
+        self.ordering = sorted(self, key=self.get, reverse=True)
+        self.ranks = dict(zip(self.ordering, range(len(self.ordering))))
+
+        # The keys to bisect on are only needed once a candidate moves
+        self.sort_keys = None
+
+    @classmethod
+    def of(cls, results):
+        """
+        :param results: A dictionary of tallied votes, or ranked results, which are returned as is
+        :return: Returns a RankedResults object
+        """
+        return results if isinstance(results, cls) else cls(results)
+
+    def __reduce__(self):
+        """
+        Pickles the results as their votes, since restoring the dictionary before the ranking would move candidates
+        within a ranking that does not exist yet
+
+        :return: Returns a tuple (class, arguments)
+        """
+        return self.__class__, (dict(self),)
+
+    def __setitem__(self, candidate, votes):
+        """
+        Sets the votes of a candidate, and moves the candidate to its new place. The place is found by bisection in
+        O(log m), but moving the candidate within the ordering and its keys takes O(m) (see the class)
+
+        :param candidate: A candidate of the results
+        :param votes: The new tallied votes of the candidate
+        :return: void
+        """
+        if candidate not in self.ids:
+            raise Exception(f"{candidate} is not a candidate of the results")
+
+        sort_keys = self.get_sort_keys()
+        super().__setitem__(candidate, votes)
+
+        old_rank = self.ranks[candidate]
+        del self.ordering[old_rank]
+        del sort_keys[old_rank]
+
+        sort_key = self.get_sort_key(candidate, votes)
+        new_rank = bisect_left(sort_keys, sort_key)
+        self.ordering.insert(new_rank, candidate)
+        sort_keys.insert(new_rank, sort_key)
+
+        for rank in range(min(old_rank, new_rank), max(old_rank, new_rank) + 1):
+            self.ranks[self.ordering[rank]] = rank
+
+    def update(self, results=(), **kwargs):
+        """
+        Sets the votes of several candidates. A few candidates are moved one by one, and many are ranked again
+
+        :param results: A dictionary (or iterable of pairs) of candidates and their new votes
+        :return: void
+        """
+        changes = dict(results, **kwargs)
+
+        if self.is_few(changes):
+            for candidate, votes in changes.items():
+                self[candidate] = votes
+            return
+
+        for candidate in changes:
+            if candidate not in self.ids:
+                raise Exception(f"{candidate} is not a candidate of the results")
+
+        dict.update(self, changes)
+        self.rank()
+
+    def setdefault(self, candidate, votes=None):
+        """
+        :param candidate: A candidate of the results
+        :param votes: Unused, as every candidate of the results has votes
+        :return: Returns the votes of the candidate - raises an exception if it is not a candidate of the results
+        """
+        if candidate not in self.ids:
+            raise Exception(f"{candidate} is not a candidate of the results")
+
+        return self[candidate]
+
+    def __ior__(self, results):
+        """
+        Sets the votes of several candidates, as update does
+
+        :param results: A dictionary (or iterable of pairs) of candidates and their new votes
+        :return: Returns the results themselves
+        """
+        self.update(results)
+
+        return self
+
+    def _remove_candidate(self, *args, **kwargs):
+        """
+        Raises an exception, as the candidates of ranked results are fixed. It stands in for every dictionary method
+        removing candidates
+
+        :return: void
+        """
+        raise Exception("Candidates cannot be removed from the results of an election")
+
+    __delitem__ = pop = popitem = clear = _remove_candidate
+
+    def is_few(self, changes):
+        """
+        :param changes: A dictionary mapping candidates to their new votes
+        :return: Returns True if the changes are few enough to move the candidates one by one
+        """
+        return len(changes) * RERANK_FRACTION <= len(self)
+
+    def get_sort_keys(self):
+        """
+        :return: Returns the keys of the candidates in the ordering, which are built the first time a candidate moves
+        """
+        if self.sort_keys is None:
+            self.sort_keys = [self.get_sort_key(candidate, self[candidate]) for candidate in self.ordering]
+
+        return self.sort_keys
+
+    def get_sort_key(self, candidate, votes):
+        """
+        :param candidate: A candidate of the results
+        :param votes: The tallied votes of the candidate
+        :return: Returns the key ordering the candidates from first to last place
+        """
+        return -votes, self.ids[candidate]
+
+    def copy(self):
+        """
+        :return: Returns a copy of the results, with its own ranking
+        """
+        results = self.__class__.__new__(self.__class__)
+        dict.update(results, self)
+
+        results.ids = self.ids
+        results.ordering = list(self.ordering)
+        results.sort_keys = None if self.sort_keys is None else list(self.sort_keys)
+        results.ranks = dict(self.ranks)
+
+        return results
+
+    def with_votes(self, changes):
+        """
+        Derives the results in which some candidates have other votes, moving only those candidates
+
+        :param changes: A dictionary mapping candidates to their new votes
+        :return: Returns a new RankedResults object
+        """
+        # The keys are built once here rather than in every derived copy
+        if self.is_few(changes):
+            self.get_sort_keys()
+
+        results = self.copy()
+        results.update(changes)
+
+        return results
+
+    def get_winner(self):
+        """
+        :return: Returns the winning candidate, in O(1)
+        """
+        return self.ordering[0]
+
+    def get_rank(self, candidate):
+        """
+        :param candidate: A candidate of the results
+        :return: Returns the place of the candidate, 0 being the winner, in O(1)
+        """
+        return self.ranks[candidate]
+
+    def get_ordering(self):
+        """
+        :return: Returns a tuple of the candidates from first to last place
+        """
+        return tuple(self.ordering)
@@ -1,32 +1,29 @@
 from abc import ABC, abstractmethod
-from copy import copy
-from agents.agent import get_winner, Agent
-from strategies import strategies_borda
-import sys
-
-'''
-TO DO: move get_tactical_overall_happiness anywhere else where it makes sense, for now it's here just for convenience sake
-'''
-
-
-def get_tactical_overall_happiness(tva_object, agent, agent_happiness, results_copy):
-    happinesses = {}
-
-    for other_agent in tva_object.get_agents():
-        if other_agent != agent:
-            other_happiness = other_agent.get_happiness(results_copy)
-            for key in other_happiness:
-                if key not in happinesses:
-                    happinesses[key] = []
-                happinesses[key].append(other_happiness[key])
-        else:
-            for key in agent_happiness:
-                if key not in happinesses:
-                    happinesses[key] = []
-                happinesses[key].append(agent_happiness[key])
+from functools import lru_cache
+from math import lcm
+import numpy as np
+from agents.agent import get_winner
+from agents.happiness import get_outcome_ranks
+from voting.counted_profile import CountedProfile
+from voting.delta_tally import DeltaTally
+from voting.election_snapshot import ElectionSnapshot
+from voting.positional_tally import MAX_TALLY, tally_positions
+from voting.ranked_results import RankedResults
+from strategies.strategies_scoring import Strategies_scoring
+
+
+def get_tactical_overall_happiness(tva_object, results_copy):
+    """
+    Computes the average happiness of all agents of an election, if the election had the given results
+
+    :param tva_object: A TVA object
+    :param results_copy: A dictionary of results
+    :return: Returns a dictionary with the overall happiness for every type of happiness
+    """
+    happinesses = tva_object.get_all_happiness(results_copy)
 
     for key in happinesses:
-        happinesses[key] = sum(happinesses[key]) / len(happinesses[key])
+        happinesses[key] = float(np.mean(happinesses[key]))
 
     return happinesses
 
@@ -36,24 +33,77 @@ class VotingScheme(ABC):
     Abstract class voting scheme
     """
 
-    def run_scheme(self, candidates, agents):
+    def run_scheme(self, candidates, agents, weights=None):
         """
         This function tallies the overall votes for all the candidates, based on the agents' preferences
 
         :param candidates: A dictionary of the candidates in the election
-        :param agents: A list of agents who are voting
-        :return: Returns a dictionary of the tallied votes for each candidate
+        :param agents: A list of agents who are voting, or a CountedProfile of their rankings, which is tallied in
+        O(distinct rankings * m)
+        :param weights: A numpy array with the weight of every agent in the list, every agent counts once when not
+        given
+        :return: Returns the tallied votes for each candidate, as RankedResults
         """
-        candidate_dict = copy(candidates)
+        if isinstance(agents, CountedProfile):
+            return self.tally_counted_profile(candidates, agents)
+
+        if len(agents) < 1:
+            return RankedResults(candidates)
 
-        for agent in agents:
+        return self.tally_profile(candidates, np.stack([agent.ballot for agent in agents]), weights)
 
-            preference_dict = agent.get_preferences()
+    def tally_profile(self, candidates, profile, weights=None):
+        """
+        Tallies a ballot matrix in one go, exactly for integer scores (see tally_positions)
+
+        :param candidates: A dictionary of the candidates in the election
+        :param profile: A numpy matrix (voters x positions) of candidate indices in preference order
+        :param weights: A numpy array with the weight of every voter, every voter counts once when not given. The
+        votes are only integers when the weights are
+        :return: Returns the tallied votes for each candidate, as RankedResults
+        """
+        totals = tally_positions(profile, self.get_score_vector(profile.shape[1]), len(candidates), weights)
 
-            for key in preference_dict:
-                candidate_dict[key] += preference_dict[key]
+        return RankedResults(zip(candidates, totals.tolist()))
 
-        return candidate_dict
+    def tally_counted_profile(self, candidates, counted_profile):
+        """
+        Tallies a counted profile, where every distinct ranking is scored once and weighed by its count
+
+        :param candidates: A dictionary of the candidates in the election
+        :param counted_profile: A CountedProfile object
+        :return: Returns the tallied votes for each candidate, as RankedResults
+        """
+        totals = counted_profile.tally(self.get_score_vector(counted_profile.n_candidates))
+
+        return RankedResults(zip(candidates, totals.tolist()))
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_score_vector(cls, n_candidates):
+        """
+        Gets the score each position in a preference list receives, as defined by tally_personal_votes
+
+        :param n_candidates: An integer for the number of candidates in the election
+        :return: Returns a read-only numpy array, where index i holds the score of the i-th preference
+        """
+        preferences = {position: 0 for position in range(n_candidates)}
+        cls().tally_personal_votes(preferences)
+
+        scores = np.array(list(preferences.values()), dtype=np.int64)
+        scores.flags.writeable = False
+
+        return scores
+
+    def get_delta_tally(self, agent, tva_object):
+        """
+        Creates an incremental tally engine for re-electing with alternative ballots of one agent
+
+        :param agent: The agent object whose ballot is being changed
+        :param tva_object: A TVA object or snapshot, whose results include the ballot the agent cast
+        :return: Returns a DeltaTally object
+        """
+        return DeltaTally(self, tva_object.candidates, tva_object.results, agent, tva_object.get_cast_ballot(agent))
 
     @abstractmethod
     def tally_personal_votes(self, preferences):
@@ -66,82 +116,76 @@ class VotingScheme(ABC):
         """
         pass
 
-    def counter_ts_by_key(self, key, agent, other_agent, tva_object_copy, all_other_agents):
+    def get_best_responses(self, tva_object, tactical_sets=None):
         """
-        Returns a list containing an opposing agent to the agent of interest. The list contains the
-        opposing agent, with their best tactical preference, the resulting outcome, and the
-        possible tactical options of the agent to counter
+        Computes the best tactical option of every agent of an election, for every type of happiness. The best
+        options do not depend on the agent that counters them, so this table is computed once per election and
+        shared by the counter votes of all agents
 
-        :param key: A string indicating the type of happiness
-        :param agent: An agent object, for whom the counter tactical votes must be made
-        :param other_agent: An agent object, who is the opposing agent
-        :param tva_object_copy: A copy of the original tva object
-        :param all_other_agents: A list of agent objects, excluding the opposing agent, and agent of interest
-        :return: Returns a list as mentioned above. Type = [str, list, list, dict]
+        :param tva_object: A TVA object
+        :param tactical_sets: A dictionary mapping the name of an agent to their tactical options, to reuse options
+        that have already been computed. Computed here when not given
+        :return: Returns a dictionary, whose indexes are the types of happiness. Each key has a dictionary mapping the
+        name of an agent to their best tactical option (a list in the format of tactical_options), or None if the
+        agent has no tactical option
         """
+        best_responses = {"H_p": {}, "H_si": {}}
 
-        other_tactical_options = self.tactical_options(other_agent, tva_object_copy)
-
-        # Hold original values to reset later
-        original_options = other_agent.preferences
-        original_results = tva_object_copy.results
-
-        percentage_happiness_options = other_tactical_options[key]
-
-        # If other agent has no tactical options, nothing to do
-        if len(percentage_happiness_options) < 1:
-            return [other_agent, None, None, None]
+        for other_agent in tva_object.get_agents():
 
-        best_option = None
-        best_happiness = 0
+            if tactical_sets is None:
+                tactical_set = self.tactical_options(other_agent, tva_object)
+            else:
+                tactical_set = tactical_sets[other_agent.name]
 
-        # Get the best tactical option of the other agent
-        for option in percentage_happiness_options:
+            for key in best_responses:
 
-            sublist = percentage_happiness_options[option]
-            happiness = sublist[3][key]
+                best_option = None
+                best_happiness = 0
 
-            if happiness > best_happiness:
-                best_option = percentage_happiness_options[option]
-                best_happiness = happiness
+                # Get the best tactical option of the other agent
+                for option in tactical_set[key].values():
+                    if option[3][key] > best_happiness:
+                        best_option = option
+                        best_happiness = option[3][key]
 
-        '''
-        TO DO: make the following work when best_option is never updated and is None
-        '''
+                best_responses[key][other_agent.name] = best_option
 
-        best_preference = best_option[0]
+        return best_responses
 
-        # Get the personal tally if the other agent had chosen their best tactical option
-        best_preference_dictionary = {}
-        for preference in best_preference:
-            best_preference_dictionary[preference] = 0
+    def counter_ts_by_key(self, key, agent, other_agent, snapshot, best_option, counter_options):
+        """
+        Returns a list containing an opposing agent to the agent of interest. The list contains the
+        opposing agent, with their best tactical preference, the resulting outcome, and the
+        possible tactical options of the agent to counter
 
-        self.tally_personal_votes(best_preference_dictionary)
-        other_agent.preferences = best_preference_dictionary
+        :param key: A string indicating the type of happiness
+        :param agent: An agent object, for whom the counter tactical votes must be made
+        :param other_agent: An agent object, who is the opposing agent
+        :param snapshot: An ElectionSnapshot of the original election
+        :param best_option: The best tactical option of the opposing agent, as given by get_best_responses
+        :param counter_options: A dictionary of the tactical options of the agent of interest per outcome, which is
+        filled as outcomes are countered, so that an outcome reached by several opposing agents is countered once
+        :return: Returns a list as mentioned above. Type = [str, list, list, dict]
+        """
 
-        new_list_agents = [agent, other_agent]
-        for i in all_other_agents:
-            if not i == other_agent:
-                new_list_agents.append(i)
+        # If other agent has no tactical options, nothing to do
+        if best_option is None:
+            return [other_agent, None, None, None]
 
-        # Get the social outcome if the other agent had chosen their best tactical option
-        new_results = self.run_scheme(tva_object_copy.candidates, new_list_agents)
-        new_results_list = sorted(new_results, key=new_results.get, reverse=True)
-        tva_object_copy.results = new_results
+        # The social outcome if the other agent had chosen their best tactical option
+        new_snapshot = snapshot.with_ballot(other_agent, best_option[0])
+        new_results = new_snapshot.results
+        new_results_list = list(new_results.get_ordering())
 
         # Depending on the new social outcome, compute the agent's new tactical options
-        counter_tactical_set = [other_agent, list(best_preference_dictionary.keys()),
-                                new_results_list,
-                                self.tactical_options(agent, tva_object_copy)[key],
-                                new_results]
+        signature = tuple(new_results.items())
+        if signature not in counter_options:
+            counter_options[signature] = self.tactical_options(agent, new_snapshot)
 
-        # Reset to defaults so future elections aren't hindered by these changes
-        tva_object_copy.results = original_results
-        other_agent.preferences = original_options
+        return [other_agent, list(best_option[0]), new_results_list, counter_options[signature][key], new_results]
 
-        return counter_tactical_set
-
-    def counter_vote(self, agent, tva_object_copy):
+    def counter_vote(self, agent, tva_object, best_responses=None, counter_options=None):
         """
         Computes the dictionary of counter votes for an agent, once each other agent has voted tactically.
         For example, when an election is run, each agent may have tactical voting strategies. If an agent was to apply
@@ -152,33 +196,43 @@ class VotingScheme(ABC):
         possible tactical options of the agent to counter
 
         :param agent: An agent object, for whom the counter tactical votes must be made
-        :param tva_object_copy: A copy of the original tva object
+        :param tva_object: A TVA object or an ElectionSnapshot, which is left untouched
+        :param best_responses: The best tactical options of all agents, as given by get_best_responses. Computed here
+        when not given; pass it in when countering for several agents of the same election
+        :param counter_options: A dictionary of the tactical options of the agent per outcome, as filled by
+        counter_ts_by_key. It may be shared by the counter votes of agents with the same ranking in the same election
         :return: Returns a dictionary as mentioned above
         """
+        snapshot = ElectionSnapshot.of(tva_object)
+
+        if best_responses is None:
+            best_responses = self.get_best_responses(snapshot)
+
+        if counter_options is None:
+            counter_options = {}
 
         counter_voting_options = {"H_p": [], "H_si": []}
 
-        all_other_agents = [copy(a) for a in tva_object_copy.get_agents() if not a == agent]
+        for other_agent in snapshot.get_agents():
 
-        for other_agent in all_other_agents:
-            counter_voting_options["H_p"].append(self.counter_ts_by_key("H_p",
-                                                                        agent, other_agent,
-                                                                        tva_object_copy,
-                                                                        all_other_agents))
+            if other_agent.name == agent.name:
+                continue
 
-            counter_voting_options["H_si"].append(self.counter_ts_by_key("H_si",
-                                                                         agent, other_agent,
-                                                                         tva_object_copy,
-                                                                         all_other_agents))
+            for key in counter_voting_options:
+                counter_voting_options[key].append(self.counter_ts_by_key(key, agent, other_agent, snapshot,
+                                                                          best_responses[key][other_agent.name],
+                                                                          counter_options))
 
         return counter_voting_options
 
-    def concurrent_vote(self, tva_object_copy):
+    def concurrent_vote(self, tva_object, tactical_sets=None):
         """
         Concurrent voting is when every agent decides to apply their tactical vote at the same time, thereby (maybe)
         changing the outcome of the election.
 
-        :param tva_object_copy
+        :param tva_object: A TVA object or an ElectionSnapshot, which is left untouched
+        :param tactical_sets: A dictionary mapping the name of an agent to their tactical options, to reuse options
+        that have already been computed. Computed here when not given
         :returns - A dictionary with a list for the two types of happiness
 
         The following indexes in each list contains:
@@ -191,14 +245,18 @@ class VotingScheme(ABC):
         1 - Preference list of the agent
         2 - Boolean, True if preference list is the agent's original preferences, False if they are tactical
         """
+        snapshot = ElectionSnapshot.of(tva_object)
 
         agent_best_pref = {"H_p": {}, "H_si": {}}
         social_outcome = {}
 
         # Get tactical options for each agent
-        for a in tva_object_copy.get_agents():
+        for a in snapshot.get_agents():
 
-            all_tact_options = self.tactical_options(a, tva_object_copy)
+            if tactical_sets is None:
+                all_tact_options = self.tactical_options(a, snapshot)
+            else:
+                all_tact_options = tactical_sets[a.name]
 
             for happiness_type in all_tact_options:
                 # If no tactical options to begin with, do not update new preferences
@@ -232,34 +290,12 @@ class VotingScheme(ABC):
                 else:
                     agent_best_pref[happiness_type][a] = best_option[0]
 
-        # Run an election for each happiness type
+        # Run an election for each happiness type, with every agent casting their chosen ballot
         for happiness_type in agent_best_pref:
 
-            all_agents = [agent for agent in agent_best_pref[happiness_type]]
-
-            agents_original_prefs = {}
-
-            # Save original preference
-            for agent in all_agents:
-                agents_original_prefs[agent] = agent.preferences
-
-            for agent in all_agents:
-
-                pref_dict = {}
-                for candidate in agent_best_pref[happiness_type][agent]:
-                    pref_dict[candidate] = 0
-
-                # Tally votes with new prefs
-                self.tally_personal_votes(pref_dict)
-                agent.preferences = pref_dict
-
-            new_results = self.run_scheme(tva_object_copy.candidates, all_agents)
+            new_results = snapshot.with_ballots(agent_best_pref[happiness_type]).results
             latest_winner = get_winner(new_results)
 
-            # Revert to original preferences to perform boolean check below
-            for agent in all_agents:
-                agent.preferences = agents_original_prefs[agent]
-
             agent_list = [[agent, agent_best_pref[happiness_type][agent],
                            agent_best_pref[happiness_type][agent] == list(agent.get_preferences().keys())]
                           for agent in agent_best_pref[happiness_type]]
@@ -271,6 +307,51 @@ class VotingScheme(ABC):
 
         return social_outcome
 
+    def get_tactical_summary(self, agent, tva_object, overall_happiness=False):
+        """
+        Summary form of tactical_options, which only keeps whether the agent has a tactical option and the best
+        happiness they can reach with it. Voting schemes can override it to find these without building every option
+
+        :param agent: The agent object for which tactical voting must be applied
+        :param tva_object: A TVA object
+        :param overall_happiness: A boolean, True if the overall happiness of the best option must be included
+        :return: Returns a dictionary with, for every type of happiness, a tuple (has_option, best_happiness), or
+        (has_option, best_happiness, best_overall_happiness) if the overall happiness is included, with None as
+        overall happiness when there is no option
+        """
+        tactical_set = self.tactical_options(agent, tva_object)
+        tactical_summary = {}
+
+        for key in tactical_set:
+            best_option = None
+            for option in tactical_set[key].values():
+                if best_option is None or option[3][key] > best_option[3][key]:
+                    best_option = option
+
+            if best_option is None:
+                tactical_summary[key] = (False, 0)
+            else:
+                tactical_summary[key] = (True, best_option[3][key])
+
+            if overall_happiness:
+                tactical_summary[key] += (None if best_option is None else best_option[4][key],)
+
+        return tactical_summary
+
+    def get_batch_tactical_summary(self, profiles, positions, totals):
+        """
+        Vectorized form of tactical_options over a batch of elections, which only keeps whether every agent has a
+        tactical option and the best happiness they can reach with it. Voting schemes without a vectorized form
+        return None, in which case the caller runs tactical_options election by election
+
+        :param profiles: A numpy tensor (elections x voters x positions) of candidate indices in preference order
+        :param positions: The position tensor of the profiles (elections x voters x candidates)
+        :param totals: A numpy matrix (elections x candidates) of tallied votes
+        :return: Returns a dictionary with, for every type of happiness, a tuple (has_option, best_happiness) of
+        numpy matrices (elections x voters), or None
+        """
+        return None
+
     @abstractmethod
     def tactical_options(self, agent, tva_object):
         """
@@ -278,12 +359,13 @@ class VotingScheme(ABC):
         agent is able to tactically change their votes to increase happiness. This function returns a dictionary
         containing all tactical options for a given voting strategy.
 
-        The dictionary follows the structure:
-        # TODO TO BE DECIDED. FOR NOW IT'S:
-        # TODO <key> : <value>, where key = option number, and value is a list with three indices
-        # TODO index 1 = new voting preference list
-        # TODO index 2 = new winner because of this agent's new preference list
-        # TODO index 3 = new happiness after subsequent re-election
+        The dictionary maps every type of happiness ("H_p", "H_si") to the options improving it, as
+        <key> : <value>, where key = option number, and value is a list with five indices
+        index 0 = new voting preference list
+        index 1 = new winner because of this agent's new preference list
+        index 2 = new results after subsequent re-election
+        index 3 = new happiness of the agent after subsequent re-election
+        index 4 = new overall happiness of all agents after subsequent re-election
 
         :param tva_object: A TVA object
         :param agent: The agent object for which tactical voting must be applied
@@ -292,409 +374,301 @@ class VotingScheme(ABC):
         pass
 
 
-class Borda(VotingScheme):
+class ScoringRule(VotingScheme):
     """
-    Borda voting class
+    Abstract class for positional scoring rules
 
-    Borda voting tallies votes in a way where, an agent's preference receive a score of m - i, where "m"
-    is the number of candidates, and "i" is the position of the preference in their preference list
+    A positional scoring rule gives the candidate at every position of a preference list a fixed score, which may not
+    increase down the list. The rule is fully defined by its score vector: tallying looks the scores up in the vector,
+    and the tactical options of every rule are found by the same exact search over the vector, which puts the target
+    candidate first and deals out the remaining scores by leeway.
 
-    For example, "A" would receive a score of 3-1 = 2, if the preferences of the agent were ACB, and the candidates
-    were ABC
+    The tactical options are enumerated within a budget: at most option_limit options per type of happiness (None for
+    no limit), and at most time_limit seconds per enumeration (None for no limit)
     """
 
+    option_limit = 20
+    time_limit = None
+
+    @classmethod
+    @abstractmethod
+    def get_scores(cls, n_candidates):
+        """
+        Abstract method for the scoring rules. Gives the score of every position of a preference list
+
+        :param n_candidates: An integer for the number of candidates in the election
+        :return: Returns a list of integer scores, in non-increasing order
+        """
+        pass
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_score_vector(cls, n_candidates):
+        """
+        Gets the score each position in a preference list receives, as defined by get_scores
+
+        :param n_candidates: An integer for the number of candidates in the election
+        :return: Returns a read-only numpy array, where index i holds the score of the i-th preference
+        """
+        scores = cls.get_scores(n_candidates)
+
+        if any(abs(score) > MAX_TALLY for score in scores):
+            raise ValueError(f"The scores of {cls.__name__} for {n_candidates} candidates do not fit in 64 bit "
+                             f"integers")
+
+        scores = np.array(scores, dtype=np.int64)
+
+        if len(scores) != n_candidates or np.any(np.diff(scores) > 0):
+            raise Exception(f"{cls.__name__} must give {n_candidates} scores in non-increasing order")
+
+        scores.flags.writeable = False
+
+        return scores
+
+    def tally_personal_votes(self, preferences):
+        scores = self.get_score_vector(len(preferences))
+        for key, score in zip(preferences, scores):
+            preferences[key] = int(score)
+
     def tactical_options(self, agent, tva_object):
-        results = tva_object.results
-        result_list = sorted(results, key=lambda k: results[k], reverse=True)
-        index = result_list.index(list(agent.preferences.keys())[0])
-
-        original_agents = []
-        # remake agent set without our agent
-        old_happiness = agent.get_happiness(tva_object.results)
-        old_winner = get_winner(tva_object.results)
-
-        for other_agent in tva_object.agents:
-            if other_agent.name != agent.name:
-                original_agents.append(other_agent)
-        new_results = self.run_scheme(tva_object.candidates, original_agents)
-
-        borda_strat = strategies_borda.Strategies_borda("Borda", 20)
-        [res_pref, res_si] = borda_strat.check_if_best(agent, new_results, index, old_winner)
+        results = RankedResults.of(tva_object.results)
+        index = results.get_rank(next(iter(agent.preferences)))
+
+        old_winner = results.get_winner()
+
+        # Tally of all agents without our agent
+        delta_tally = self.get_delta_tally(agent, tva_object)
+        new_results = delta_tally.get_residual_results()
+
+        strategy = Strategies_scoring(self.get_score_vector(len(results)), self.option_limit, self.time_limit)
+        [res_pref, res_si] = strategy.check_if_best(agent, new_results, index, old_winner)
         tactical_set = {"H_p": {}, "H_si": {}}
 
         if len(res_pref) > 0:
             res_pref_winner = next(iter(res_pref[0]))
             i = 0
             for x in res_pref:
-                alt_agent = Agent(agent.name, ''.join(x), tva_object.scheme)
-                original_agents.append(alt_agent)
-                new_results = self.run_scheme(tva_object.candidates, original_agents)
+                new_results = delta_tally.get_results(x)
                 new_happiness = agent.get_happiness(new_results)
 
-                new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                       new_happiness, new_results)
+                new_overall_happiness = get_tactical_overall_happiness(tva_object, new_results)
                 tactical_set["H_p"][i] = [list(x.keys()), res_pref_winner,
                                           new_results, new_happiness,
                                           new_overall_happiness]
                 i += 1
-                original_agents.pop()
 
         if len(res_si) > 0:
             j = 0
             for y in res_si:
-                alt_agent = Agent(agent.name, ''.join(y), tva_object.scheme)
-                original_agents.append(alt_agent)
-                new_results = self.run_scheme(tva_object.candidates, original_agents)
+                new_results = delta_tally.get_results(y)
                 new_happiness = agent.get_happiness(new_results)
                 new_winner = get_winner(new_results)
 
-                new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                       new_happiness, new_results)
+                new_overall_happiness = get_tactical_overall_happiness(tva_object, new_results)
                 tactical_set["H_si"][j] = [list(y.keys()), new_winner,
                                            new_results, new_happiness,
                                            new_overall_happiness]
                 j += 1
-                original_agents.pop()
         return tactical_set
 
-    def tally_personal_votes(self, preferences):
-        m = len(preferences)
-        i = 1
-        for key in preferences:
-            preferences[key] = m - i
-            i += 1
-
-
-class Plurality(VotingScheme):
-    """
-    Plurality voting class
-
-    The agents highest preference gets a score of 1
-    """
+    def get_tactical_summary(self, agent, tva_object, overall_happiness=False):
+        results = RankedResults.of(tva_object.results)
+        m = len(results)
+        prefs = agent.get_preferences()
+        index = results.get_rank(next(iter(prefs)))
 
-    def tally_personal_votes(self, preferences):
+        old_winner = results.get_winner()
 
-        first_preference = next(iter(preferences))
-        preferences[first_preference] += 1
+        # Tally of all agents without our agent
+        delta_tally = self.get_delta_tally(agent, tva_object)
+        new_results = delta_tally.get_residual_results()
 
-    def tactical_options(self, agent, tva_object):
-
-        tactical_set = {"H_p": {}, "H_si": {}}
+        strategy = Strategies_scoring(self.get_score_vector(m), 1)
+        tactical_summary = {"H_p": (False, 0), "H_si": (False, 0)}
+        best_options = {"H_p": None, "H_si": None}
 
         """
         For percentage_my_preference
         """
 
-        total_agents = len(tva_object.get_agents())
-
-        winner = get_winner(tva_object.results)
-
-        # If more than half agents voted for the winning candidate, there is no tactical voting strategy for the
-        # current agent
-        if not tva_object.results[winner] > (total_agents / 2):
-
-            original_list = list(agent.preferences)
-            stop_index = original_list.index(winner)
-
-            for i in range(1, stop_index):
-
-                new_pref_list = copy(original_list)
-                temp = new_pref_list[i]
-                new_pref_list[i] = new_pref_list[0]
-                new_pref_list[0] = temp
-
-                results_copy = copy(tva_object.results)
-                # Our original vote is taken away from the results
-                results_copy[original_list[0]] -= 1
-
-                # We add one vote to the candidate that we switch
-                results_copy[original_list[i]] += 1
-
-                new_winner = get_winner(results_copy)
-
-                if new_winner != winner:
-                    agent_happiness = agent.get_happiness(results_copy)
-                    new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                           agent_happiness, results_copy)
-
-                    tactical_set["H_p"][i] = [new_pref_list, new_winner,
-                                              results_copy, agent_happiness,
-                                              new_overall_happiness]
+        # The best option makes the most preferred candidate above the winner win, so the search stops there
+        for position, candidate in enumerate(prefs):
+            if candidate == old_winner:
+                break
+            if strategy.is_winner_possible(candidate, prefs, new_results):
+                tactical_summary["H_p"] = (True, ((m - position - 1) / (m - 1)) * 100)
+                if overall_happiness:
+                    best_options["H_p"] = next(strategy.iter_winner_options(candidate, prefs, new_results))
+                break
 
         """
         For percentage_social_index
         """
 
-        # Not possible
-
-        return tactical_set
-
-
-class AntiPlurality(VotingScheme):
-    """
-    Anti-plurality voting class
-
-    The agent's lowest preference gets a score of 0, while others get 1
-    """
-
-    def tally_personal_votes(self, preferences):
-
-        i = 0
-        for key in preferences:
-
-            if i < len(preferences) - 1:
-                preferences[key] += 1
-
-            i += 1
-
-    def tactical_options(self, agent, tva_object):
-
-        tactical_set = {"H_p": {}, "H_si": {}}
+        favourite = next(iter(prefs))
+        position = strategy.engine.get_highest_position(favourite, prefs, new_results)
+        if position < index:
+            tactical_summary["H_si"] = (True, ((m - position - 1) / (m - 1)) * 100)
+            if overall_happiness:
+                best_options["H_si"] = next(strategy.iter_highest_position_options(favourite, prefs, new_results,
+                                                                                  index))
+
+        if overall_happiness:
+            for key in tactical_summary:
+                best_overall_happiness = None
+                if best_options[key] is not None:
+                    best_overall_happiness = get_tactical_overall_happiness(
+                        tva_object, delta_tally.get_results(best_options[key]))[key]
+                tactical_summary[key] += (best_overall_happiness,)
+
+        return tactical_summary
+
+    def get_batch_tactical_summary(self, profiles, positions, totals):
+        n_elections, n_voters, m = profiles.shape
+        scores = self.get_score_vector(m)
+
+        # Only approval-style rules have a closed form: the first a preferences get a score of 1, all others 0
+        if scores[0] != 1 or scores[-1] < 0:
+            return None
+
+        a = int(scores.sum())
+
+        # Tally of all other agents, for every agent, ranked by a key in which ties go to the lowest index. A candidate
+        # with 0 points stays below the target if its key is below the key of the target one point up, and a candidate
+        # with 1 point if its key is below the key of the target
+        index = np.arange(m)
+        residual = totals[:, None, :] - scores[positions]
+        keys = residual * m + (m - 1 - index)
+        key_ranks = np.argsort(np.argsort(keys, axis=2), axis=2)
+
+        order, ranks = get_outcome_ranks(totals)
+        winner_positions = np.take_along_axis(positions, np.broadcast_to(order[:, :1, None],
+                                                                         (n_elections, n_voters, 1)), axis=2)
 
         """
         For percentage_my_preference
         """
 
-        winner = get_winner(tva_object.results)
-        original_list = list(agent.preferences)
-        winner_index = original_list.index(winner)
-
-        # if the winner is not already in the last position I can investigate if I have a
-        # tactical voting option
-        if original_list[-1] != winner:
-
-            new_pref_list = copy(original_list)
-            temp = new_pref_list[-1]
-            new_pref_list[-1] = winner
-            new_pref_list[winner_index] = temp
+        # A target can win if no other candidate beats it with 0 points, and a - 1 others can take the other points
+        best = np.argmax(keys, axis=2)[:, :, None]
+        top = np.take_along_axis(keys, best, axis=2)
+        runner_up = np.where(index == best, -1, keys).max(axis=2, keepdims=True)
+        can_win = (np.where(index == best, runner_up, top) < keys + m) & (key_ranks >= a - 1)
 
-            results_copy = copy(tva_object.results)
-            results_copy[original_list[-1]] += 1
-            results_copy[original_list[winner_index]] -= 1
+        # The best option makes the most preferred candidate above the winner win
+        options = np.take_along_axis(can_win, profiles.astype(np.intp), axis=2) & (index < winner_positions)
 
-            new_winner = get_winner(results_copy)
-
-            agent_happiness = agent.get_happiness(results_copy)
-
-            if agent_happiness["H_p"] > agent.get_happiness(tva_object.results)["H_p"]:
-                new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                       agent_happiness, results_copy)
-
-                tactical_set["H_p"][0] = [new_pref_list, new_winner,
-                                          results_copy, agent_happiness,
-                                          new_overall_happiness]
+        has_option = options.any(axis=2)
+        best_happiness = np.where(has_option, ((m - np.argmax(options, axis=2) - 1) / (m - 1)) * 100, 0)
 
         """
         For percentage_social_index
         """
-        pref_dict = copy(agent.get_preferences())
-        pref_list = list(pref_dict.keys())
-
-        least_preferred = pref_list[-1]
-
-        results_copy = copy(tva_object.results)
-        results_copy[least_preferred] += 1
-
-        original_happiness = agent.get_happiness(tva_object.results)
-
-        if results_copy[least_preferred] > results_copy[pref_list[0]]:
-
-            tactical_set["H_si"] = {}
-
-        elif results_copy[least_preferred] == results_copy[pref_list[0]] and least_preferred < pref_list[0]:
-
-            tactical_set["H_si"] = {}
-
-        else:
-
-            results_copy = copy(tva_object.results)
-            results_list = sorted(results_copy, key=lambda k: results_copy[k], reverse=True)
-
-            stop_index = results_list.index(pref_list[0])
 
-            for i in range(0, stop_index):
+        # The first preference takes a point. The candidates below its key take the other a - 1 points, and the
+        # candidates below its key one point up the m - a zeros
+        favourites = profiles[:, :, :1].astype(np.intp)
+        favourite_keys = np.take_along_axis(keys, favourites, axis=2)
+        n_below = np.take_along_axis(key_ranks, favourites, axis=2)[:, :, 0]
+        n_below_up = (keys < favourite_keys + m).sum(axis=2) - 1
 
-                list_copy = copy(pref_list)
+        max_losers = np.minimum(n_below_up, np.minimum(n_below, a - 1) + m - a)
+        favourite_ranks = np.take_along_axis(ranks, favourites[:, :, 0], axis=1)
 
-                temp_i = results_list[i]
-                temp_last = pref_list[-1]
+        has_si_option = m - 1 - max_losers < favourite_ranks
+        best_si_happiness = np.where(has_si_option, (max_losers / (m - 1)) * 100, 0)
 
-                list_copy[pref_list.index(temp_i)] = temp_last
-                list_copy[-1] = temp_i
-                agent_copy = copy(agent)
+        return {"H_p": (has_option, best_happiness), "H_si": (has_si_option, best_si_happiness)}
 
-                new_prefs = {}
-                for candidate in list_copy:
-                    new_prefs[candidate] = 0
 
-                self.tally_personal_votes(new_prefs)
-                agent_copy.preferences = new_prefs
-
-                new_agents = [agent_copy]
-
-                for a in tva_object.get_agents():
-                    if not a == agent:
-                        new_agents.append(a)
-
-                new_results = self.run_scheme(tva_object.candidates, new_agents)
-                new_winner = get_winner(new_results)
-
-                new_happiness = agent.get_happiness(new_results)
-
-                if new_happiness["H_si"] <= original_happiness["H_si"]:
-                    continue
+class Borda(ScoringRule):
+    """
+    Borda voting class
 
-                new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                       new_happiness, new_results)
+    Borda voting tallies votes in a way where, an agent's preference receive a score of m - i, where "m"
+    is the number of candidates, and "i" is the position of the preference in their preference list
 
-                tactical_set["H_si"][i] = [list_copy, new_winner, new_results,
-                                           new_happiness, new_overall_happiness]
+    For example, "A" would receive a score of 3-1 = 2, if the preferences of the agent were ACB, and the candidates
+    were ABC
+    """
 
-        return tactical_set
+    @classmethod
+    def get_scores(cls, n_candidates):
+        return [n_candidates - i for i in range(1, n_candidates + 1)]
 
 
-class VotingForTwo(VotingScheme):
+class TruncatedBorda(ScoringRule):
     """
-    Voting for two
+    Truncated Borda voting class
 
-    First and second choice get a score of 1
+    Only the first "depth" preferences of an agent are scored, the way Borda scores a list of "depth" candidates: the
+    first preference gets depth, the second depth - 1, and so on. All other candidates get a score of 0. Subclasses
+    can set a different depth
     """
 
-    def tally_personal_votes(self, preferences):
-
-        iterable = iter(preferences)
-
-        preference = next(iterable)
-        preferences[preference] += 1
-        preference = next(iterable)
-        preferences[preference] += 1
-
-    def tactical_options(self, agent, tva_object):
-
-        tactical_set = {"H_p": {}, "H_si": {}}
-
-        """
-        For percentage_my_preference
-        """
-
-        winner = get_winner(tva_object.results)
-        original_list = list(agent.preferences)
-        winner_index = original_list.index(winner)
-
-        # if the winner is not in the third position of my preference order I can investigate
-        # if I have tactical voting options
-        if winner_index != 2:
-
-            if winner_index == 1:
-
-                for i in range(2, len(original_list)):
-
-                    new_pref_list = copy(original_list)
-                    temp = new_pref_list[i]
-                    new_pref_list[i] = winner
-                    new_pref_list[1] = temp
-
-                    results_copy = copy(tva_object.results)
-                    results_copy[original_list[1]] -= 1
-                    results_copy[original_list[i]] += 1
-
-                    new_winner = get_winner(results_copy)
-
-                    if new_winner == original_list[0]:
-                        agent_happiness = agent.get_happiness(results_copy)
-                        new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                               agent_happiness, results_copy)
-
-                        tactical_set["H_p"][i - 2] = [new_pref_list, new_winner,
-                                                      results_copy, agent_happiness,
-                                                      new_overall_happiness]
-
-            else:
-
-                for i in range(2, winner_index):
-
-                    new_pref_list = copy(original_list)
-                    temp = new_pref_list[i]
-                    new_pref_list[i] = new_pref_list[1]
-                    new_pref_list[1] = temp
+    depth = 3
 
-                    results_copy = copy(tva_object.results)
-                    results_copy[original_list[i]] += 1
-                    results_copy[original_list[1]] -= 1
+    @classmethod
+    def get_scores(cls, n_candidates):
+        return [max(cls.depth - i, 0) for i in range(n_candidates)]
 
-                    new_winner = get_winner(results_copy)
 
-                    if original_list.index(new_winner) < winner_index:
-                        agent_happiness = agent.get_happiness(results_copy)
-                        new_overall_happiness = get_tactical_overall_happiness(tva_object, agent,
-                                                                               agent_happiness, results_copy)
-
-                        tactical_set["H_p"][i - 2] = [new_pref_list, new_winner,
-                                                      results_copy, agent_happiness,
-                                                      new_overall_happiness]
-
-        """
-        For percentage_social_index
-        """
-        pref_dict = copy(agent.get_preferences())
-        pref_list = list(pref_dict.keys())
-
-        first_pref = pref_list[0]
-        second_pref = pref_list[1]
-
-        original_happiness = agent.get_happiness(tva_object.results)
-
-        results_dict = copy(tva_object.results)
+class Dowdall(ScoringRule):
+    """
+    Dowdall voting class
 
-        if not results_dict[second_pref] - results_dict[first_pref] >= 2 or \
-                (results_dict[second_pref] - results_dict[first_pref] == 1 and second_pref < first_pref):
+    The i-th preference of an agent gets a score of 1 / i. To keep the tally exact, the scores are scaled by the least
+    common multiple of 1, ..., m, which does not change the outcome. The scaled scores fit in 64 bit integers up to
+    42 candidates, and the tallies as long as the voters times lcm(1, ..., m) do; larger elections raise a ValueError
+    """
 
-            for i in range(2, len(pref_list)):
+    @classmethod
+    def get_scores(cls, n_candidates):
+        scale = lcm(*range(1, n_candidates + 1))
+        return [scale // i for i in range(1, n_candidates + 1)]
 
-                results_dict_copy = copy(results_dict)
 
-                results_dict_copy[pref_list[i]] += 1
+class KApproval(ScoringRule):
+    """
+    K-approval voting class
 
-                if results_dict_copy[pref_list[i]] > results_dict_copy[first_pref] and pref_list[i] < first_pref:
-                    results_dict_copy[pref_list[i]] -= 1
-                    continue
+    The first k preferences of an agent get a score of 1, all others 0. Subclasses set k
+    """
 
-                else:
+    k = 3
 
-                    results_dict_copy[pref_list[i]] -= 1
+    @classmethod
+    def get_scores(cls, n_candidates):
+        return [1 if i < cls.k else 0 for i in range(n_candidates)]
 
-                    pref_list_copy = copy(pref_list)
 
-                    temp = pref_list_copy[i]
-                    pref_list_copy[i] = second_pref
-                    pref_list_copy[1] = temp
+class Plurality(KApproval):
+    """
+    Plurality voting class
 
-                    new_pref_dict = {}
-                    for element in pref_list_copy:
-                        new_pref_dict[element] = 0
+    The agents highest preference gets a score of 1
+    """
 
-                    self.tally_personal_votes(new_pref_dict)
-                    agent_copy = copy(agent)
-                    agent_copy.preferences = new_pref_dict
+    k = 1
 
-                    new_agents = [agent_copy]
 
-                    for a in tva_object.get_agents():
-                        if not a == agent:
-                            new_agents.append(a)
+class VotingForTwo(KApproval):
+    """
+    Voting for two
 
-                    new_results = self.run_scheme(tva_object.candidates, new_agents)
-                    new_winner = get_winner(new_results)
+    First and second choice get a score of 1
+    """
 
-                    new_happiness = agent.get_happiness(new_results)
+    k = 2
 
-                    if new_happiness["H_si"] <= original_happiness["H_si"]:
-                        continue
 
-                    new_overall_happiness = get_tactical_overall_happiness(tva_object, agent, new_happiness,
-                                                                           new_results)
+class AntiPlurality(ScoringRule):
+    """
+    Anti-plurality voting class
 
-                    tactical_set["H_si"][i - 2] = [pref_list_copy, new_winner, new_results,
-                                                   new_happiness, new_overall_happiness]
+    The agent's lowest preference gets a score of 0, while others get 1
+    """
 
-        return tactical_set
+    @classmethod
+    def get_scores(cls, n_candidates):
+        return [1] * (n_candidates - 1) + [0]